@@ -0,0 +1,375 @@
+"""End-to-end pipeline benchmarks against the offline stand-ins.
+
+Each workload runs ``build_project`` (which renders through ``render_project``)
+in a fresh process so peak RSS is per run, while the stand-ins run in this
+process and count the bytes moved::
+
+    python -m benchmarks.pipeline run --workload small --workload medium --repeat 3 --output before.json
+    python -m benchmarks.pipeline run --workload medium --config tts_workers=8 --output after.json
+    python -m benchmarks.pipeline compare before.json after.json
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from videogen.standins import StandInSettings, parse_behaviors, start_standins
+
+
+RESULT_VERSION = 1
+
+# Round-trip latencies in the range the real services show, and a CDN that
+# is fast but not free.
+DEFAULT_BEHAVIOR = "openai=0.6,speech=0.4,pexels=0.15,pexels-cdn=0.05:0:50000000,transcripts=0.2,upload=0.1:0:20000000"
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Shape of one synthetic job."""
+
+    segments: int = 6
+    script_words: int = 120
+    sources: int = 3
+    transcript_words: int = 3000
+    clip_width: int = 1280
+    clip_height: int = 720
+    clip_seconds: float = 10.0
+    missing_video_ratio: float = 0.0
+    render: bool = True
+    upload: bool = False
+
+
+WORKLOADS: Dict[str, Workload] = {
+    "small": Workload(segments=4, script_words=80, sources=2, transcript_words=2000),
+    "medium": Workload(segments=8, script_words=150, sources=4, transcript_words=6000, clip_width=1920, clip_height=1080, missing_video_ratio=0.1),
+    "long": Workload(segments=16, script_words=220, sources=8, transcript_words=12000, clip_width=1920, clip_height=1080, clip_seconds=12.0, missing_video_ratio=0.25),
+    "sparse": Workload(segments=8, script_words=120, sources=3, missing_video_ratio=0.6),
+    "no-render": Workload(segments=8, script_words=150, sources=4, transcript_words=6000, render=False),
+    "publish": Workload(segments=4, script_words=80, sources=2, transcript_words=2000, upload=True),
+}
+
+# Pipeline entry points timed as stages: (module, attribute path, stage).
+STAGES: List[Tuple[str, str, str]] = [
+    ("videogen.cli", "load_source_texts", "transcripts"),
+    ("videogen.openai_utils", "OpenAIWorkflow.generate_script_outline", "outline"),
+    ("videogen.openai_utils", "OpenAIWorkflow.stream_script_outline", "outline"),
+    ("videogen.openai_utils", "OpenAIWorkflow.generate_script_outline_map_reduce", "outline"),
+    ("videogen.openai_utils", "AsyncOpenAIWorkflow.generate_script_outline", "outline"),
+    ("videogen.openai_utils", "AsyncOpenAIWorkflow.stream_script_outline", "outline"),
+    ("videogen.openai_utils", "AsyncOpenAIWorkflow.generate_script_outline_map_reduce", "outline"),
+    ("videogen.openai_utils", "OpenAIWorkflow.generate_speech", "tts"),
+    ("videogen.openai_utils", "AsyncOpenAIWorkflow.generate_speech", "tts"),
+    ("videogen.pexels", "PexelsClient.search_and_download", "stock"),
+    ("videogen.cli", "probe_duration", "probe"),
+    ("videogen.cli", "render_project", "render"),
+    ("videogen.cli", "upload_video", "upload"),
+]
+
+
+class StageTimer:
+    """Accumulates busy time, call count and wall span per stage across threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: str, started: float, ended: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "first_start": float("inf"), "last_end": 0.0})
+            entry["seconds"] += ended - started
+            entry["calls"] += 1
+            entry["first_start"] = min(entry["first_start"], started - self.origin)
+            entry["last_end"] = max(entry["last_end"], ended - self.origin)
+
+    def wrap(self, func: Callable[..., Any], stage: str) -> Callable[..., Any]:
+        """Time ``func``; generators and coroutines are timed until they finish."""
+        record = self.record
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_generator(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                finally:
+                    record(stage, started, time.perf_counter())
+            return async_generator
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def coroutine(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(stage, started, time.perf_counter())
+            return coroutine
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    yield from func(*args, **kwargs)
+                finally:
+                    record(stage, started, time.perf_counter())
+            return generator
+
+        @functools.wraps(func)
+        def plain(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, started, time.perf_counter())
+        return plain
+
+    def install(self) -> None:
+        import importlib
+
+        for module_name, path, stage in STAGES:
+            owner: Any = importlib.import_module(module_name)
+            *parents, attribute = path.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent)
+            setattr(owner, attribute, self.wrap(getattr(owner, attribute), stage))
+
+
+def _coerce(value: str, current: Any) -> Any:
+    if isinstance(current, bool):
+        return value.lower() in ("1", "true", "yes", "on")
+    if isinstance(current, int):
+        return int(value)
+    if isinstance(current, float):
+        return float(value)
+    return value
+
+
+def _assignments(items: List[str], target: Any) -> Dict[str, Any]:
+    """Turn ``["key=value", ...]`` into typed values for the fields of ``target``."""
+    names = {item.name for item in fields(target)}
+    values: Dict[str, Any] = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        if key not in names:
+            raise SystemExit(f"Unknown setting {key!r}; choose from {', '.join(sorted(names))}")
+        values[key] = _coerce(value, getattr(target, key))
+    return values
+
+
+def _run_in_child(workload: Dict[str, Any], environment: Dict[str, str], overrides: List[str], use_async: bool, working_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Run one job; executed in a fresh process.
+
+    ``working_dir`` is shared by the repeats of a workload when caches are
+    kept, so runs after the first find the caches warm.
+    """
+    os.environ.update(environment)
+    from videogen.cli import build_project, build_project_async
+    from videogen.config import VideoGenConfig
+    from videogen.ratelimit import configure_limiter, parse_limits
+
+    timer = StageTimer()
+    timer.install()
+    with tempfile.TemporaryDirectory(prefix="videogen-bench-") as directory:
+        os.environ["VIDEOGEN_WORKING_DIR"] = working_dir or str(Path(directory) / "working")
+        os.environ["VIDEOGEN_OUTPUT_DIR"] = str(Path(directory) / "output")
+        config = VideoGenConfig.from_environment()
+        for key, value in _assignments(overrides, config).items():
+            setattr(config, key, value)
+        configure_limiter(None, parse_limits(config.rate_limits))
+        options = dict(
+            urls=[f"https://www.youtube.com/watch?v=bench{index:06d}" for index in range(workload["sources"])],
+            prompt="Benchmark brief: an explainer built from the source videos.",
+            config=config,
+            project_name="benchmark",
+            render=workload["render"],
+            upload=workload["upload"],
+            upload_title=None,
+            upload_description=None,
+            privacy_status="private",
+        )
+        started = time.perf_counter()
+        if use_async:
+            project = asyncio.run(build_project_async(**options))
+        else:
+            project = build_project(**options)
+        wall = time.perf_counter() - started
+        output_bytes = project.render_path.stat().st_size if workload["render"] and project.render_path.exists() else 0
+    return {
+        "wall_seconds": wall,
+        "stages": timer.stages,
+        "segments": len(project.segments),
+        "segments_without_video": sum(1 for segment in project.segments if segment.video_path is None),
+        "narration_seconds": sum(segment.duration for segment in project.segments),
+        "output_bytes": output_bytes,
+        # ru_maxrss is in KiB on Linux and bytes on macOS.
+        "peak_rss_bytes": _rss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+        "children_peak_rss_bytes": _rss_bytes(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),
+    }
+
+
+def _rss_bytes(value: int) -> int:
+    return value if sys.platform == "darwin" else value * 1024
+
+
+def _traffic(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    traffic: Dict[str, Dict[str, int]] = {}
+    for service, counters in after.items():
+        previous = before.get(service, {})
+        traffic[service] = {name: value - previous.get(name, 0) for name, value in counters.items()}
+    return traffic
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    names = args.workload or ["small"]
+    behaviors = parse_behaviors(args.behavior)
+    results: List[Dict[str, Any]] = []
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        if name not in WORKLOADS:
+            raise SystemExit(f"Unknown workload {name!r}; choose from {', '.join(WORKLOADS)}")
+        workload = WORKLOADS[name]
+        workload = replace(workload, **_assignments(args.param, workload))
+        settings = StandInSettings(
+            seed=args.seed,
+            behaviors=behaviors,
+            segments=workload.segments,
+            script_words=workload.script_words,
+            transcript_words=workload.transcript_words,
+            clip_width=workload.clip_width,
+            clip_height=workload.clip_height,
+            clip_seconds=workload.clip_seconds,
+            missing_video_ratio=workload.missing_video_ratio,
+            media_dir=args.media_dir,
+        )
+        with start_standins(settings) as server, tempfile.TemporaryDirectory(prefix="videogen-bench-cache-") as shared:
+            environment = {**server.environment(), "VIDEOGEN_NO_CACHE": "" if args.cache else "1"}
+            working_dir = str(Path(shared) / "working") if args.cache else None
+            for repeat in range(args.repeat):
+                before = server.stats()
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    measured = executor.submit(_run_in_child, asdict(workload), environment, args.config, args.use_async, working_dir).result()
+                traffic = _traffic(before, server.stats())
+                results.append({
+                    "workload": name,
+                    "repeat": repeat,
+                    # With --cache the first run fills the caches and later ones reuse them.
+                    "cache": ("cold" if repeat == 0 else "warm") if args.cache else None,
+                    "params": asdict(workload),
+                    **measured,
+                    "traffic": traffic,
+                    "bytes_transferred": sum(counters.get("bytes_in", 0) + counters.get("bytes_out", 0) for counters in traffic.values()),
+                })
+                state = f" ({results[-1]['cache']})" if args.cache else ""
+                print(f"{name} #{repeat + 1}{state}: {measured['wall_seconds']:.2f}s, peak RSS {measured['peak_rss_bytes'] / 2**20:.0f} MiB", flush=True)
+    return {
+        "version": RESULT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": _git_revision(),
+        "label": args.label,
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "behavior": args.behavior,
+        "config": args.config,
+        "async": args.use_async,
+        "results": results,
+    }
+
+
+def _medians(report: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Median wall time, stage times, peak RSS and traffic per workload, cold and warm runs apart."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for result in report["results"]:
+        name = result["workload"] + (f" [{result['cache']}]" if result.get("cache") else "")
+        grouped.setdefault(name, []).append(result)
+    medians: Dict[str, Dict[str, float]] = {}
+    for name, runs in grouped.items():
+        row = {
+            "wall_seconds": statistics.median(run["wall_seconds"] for run in runs),
+            "peak_rss_mib": statistics.median(run["peak_rss_bytes"] for run in runs) / 2**20,
+            "transferred_mib": statistics.median(run["bytes_transferred"] for run in runs) / 2**20,
+        }
+        for stage in sorted({stage for run in runs for stage in run["stages"]}):
+            row[f"{stage}_seconds"] = statistics.median(run["stages"].get(stage, {}).get("seconds", 0.0) for run in runs)
+        medians[name] = row
+    return medians
+
+
+def compare(paths: List[Path]) -> None:
+    """Print each metric per workload for every report, with the change against the first."""
+    reports = [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+    tables = [_medians(report) for report in reports]
+    labels = [report.get("label") or report.get("revision") or path.stem for report, path in zip(reports, paths)]
+    for workload in sorted({name for table in tables for name in table}):
+        print(f"\n== {workload}")
+        print(f"{'metric':<24}" + "".join(f"{label:>22}" for label in labels))
+        baseline = tables[0].get(workload, {})
+        for metric in sorted({metric for table in tables for metric in table.get(workload, {})}):
+            cells = []
+            for table in tables:
+                value = table.get(workload, {}).get(metric)
+                if value is None:
+                    cells.append(f"{'-':>22}")
+                    continue
+                base = baseline.get(metric)
+                change = f" ({(value - base) / base:+.0%})" if base and table is not tables[0] else ""
+                cells.append(f"{value:.2f}{change}".rjust(22))
+            print(f"{metric:<24}" + "".join(cells))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmarks against the offline stand-ins")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run workloads and write a JSON report")
+    run_parser.add_argument("--workload", action="append", help=f"Workload preset, repeatable ({', '.join(WORKLOADS)})")
+    run_parser.add_argument("--param", action="append", default=[], help="Override a workload field, e.g. segments=12")
+    run_parser.add_argument("--config", action="append", default=[], help="Override a VideoGenConfig field, e.g. tts_workers=8")
+    run_parser.add_argument("--behavior", default=DEFAULT_BEHAVIOR, help="Stand-in latency:error_rate:bandwidth:status per service")
+    run_parser.add_argument("--repeat", type=int, default=1)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--cache", action="store_true", help="Keep the pipeline's on-disk caches, shared by the repeats of a workload; the first run is reported as cold, the rest as warm")
+    run_parser.add_argument("--async", dest="use_async", action="store_true", help="Benchmark build_project_async")
+    run_parser.add_argument("--media-dir", type=Path, help="Reuse generated stand-in media between invocations")
+    run_parser.add_argument("--label", help="Name shown for this report in comparisons")
+    run_parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+
+    compare_parser = commands.add_parser("compare", help="Compare JSON reports, the first one being the baseline")
+    compare_parser.add_argument("reports", nargs="+", type=Path)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        compare(args.reports)
+        return
+    report = run(args)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
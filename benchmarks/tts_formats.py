@@ -0,0 +1,87 @@
+"""Compare probe and render time for each narration format.
+
+Synthetic narration is generated locally with ffmpeg, so no API key is needed::
+
+    python -m benchmarks.tts_formats --segments 6 --seconds 20 --output tts_formats.json
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+
+from moviepy.config import get_setting
+
+from videogen.audio import AUDIO_EXTENSIONS, MUXABLE_FORMATS, probe_duration
+from videogen.project import ProjectSegment
+from videogen.render import render_project
+
+
+# How the TTS API encodes each format; "pcm" is stored as WAV by the workflow.
+ENCODERS: Dict[str, List[str]] = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k", "-f", "mp3"],
+    "aac": ["-c:a", "aac", "-b:a", "128k", "-f", "adts"],
+    "opus": ["-c:a", "libopus", "-b:a", "64k", "-f", "ogg"],
+    "flac": ["-c:a", "flac", "-f", "flac"],
+    "wav": ["-c:a", "pcm_s16le", "-f", "wav"],
+    "pcm": ["-c:a", "pcm_s16le", "-f", "wav"],
+}
+
+
+def synthesize(path: Path, fmt: str, seconds: float, frequency: int) -> None:
+    source = f"sine=frequency={frequency}:duration={seconds}:sample_rate=24000"
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-v", "error", "-f", "lavfi", "-i", source, "-ac", "1", *ENCODERS[fmt], str(path)]
+    subprocess.run(command, check=True)
+
+
+def run(fmt: str, directory: Path, segments: int, seconds: float, fps: int) -> Dict[str, float]:
+    speech_paths = []
+    for index in range(segments):
+        path = directory / f"segment_{index:02d}.{AUDIO_EXTENSIONS[fmt]}"
+        synthesize(path, fmt, seconds, 220 + 40 * index)
+        speech_paths.append(path)
+
+    started = time.perf_counter()
+    durations = [probe_duration(path) for path in speech_paths]
+    probed = time.perf_counter()
+    project_segments = [
+        ProjectSegment(index=index, title="", summary="", script="", keywords=[], speech_path=path, video_path=None, duration=duration)
+        for index, (path, duration) in enumerate(zip(speech_paths, durations))
+    ]
+    destination = render_project(project_segments, directory / f"render_{fmt}.mp4", fps=fps, audio_format=fmt)
+    rendered = time.perf_counter()
+    return {
+        "probe_seconds": probed - started,
+        "render_seconds": rendered - probed,
+        "total_seconds": rendered - started,
+        "narration_bytes": sum(path.stat().st_size for path in speech_paths),
+        "audio_seconds": sum(durations),
+        "output_bytes": destination.stat().st_size,
+        "direct_mux": fmt in MUXABLE_FORMATS,
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", default=",".join(ENCODERS), help="Comma separated formats to compare")
+    parser.add_argument("--segments", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Narration length per segment")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for fmt in filter(None, args.formats.split(",")):
+        with tempfile.TemporaryDirectory(prefix=f"videogen-{fmt}-") as directory:
+            results[fmt] = run(fmt, Path(directory), args.segments, args.seconds, args.fps)
+        print(f"{fmt:>5}: probe {results[fmt]['probe_seconds']:.3f}s  render {results[fmt]['render_seconds']:.2f}s  total {results[fmt]['total_seconds']:.2f}s")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Sentence scoring and budgeted compaction."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from videogen import compaction
+from videogen.tokens import count_tokens
+
+
+def _transcript(rng: random.Random, sentences: int) -> str:
+    words = [f"term{index}" for index in range(60)] + ["the", "and", "École", "école"]
+    return " ".join(" ".join(rng.choice(words) for _ in range(rng.randint(0, 20))) + rng.choice([".", "!", "?"]) for _ in range(sentences))
+
+
+def test_array_and_counter_scoring_agree():
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    documents = [compaction.split_sentences(_transcript(rng, count)) for count in (0, 1, 40, 200)]
+    tokenized = [[[word.casefold() for word in compaction._WORD_RE.findall(sentence)] for sentence in sentences] for sentences in documents]
+    arrays = compaction._score_arrays(tokenized)
+    counters = compaction._score_counters(tokenized)
+    assert [len(scores) for scores in arrays] == [len(scores) for scores in counters]
+    for array_scores, counter_scores in zip(arrays, counters):
+        assert array_scores == pytest.approx(counter_scores)
+
+
+def test_compaction_stays_within_budget_and_keeps_order():
+    rng = random.Random(5)
+    texts = [_transcript(rng, 120), _transcript(rng, 80)]
+    result = compaction.compact_transcripts(texts, 400)
+    assert result.tokens_after <= 400
+    for original, compacted in zip(texts, result.texts):
+        remaining = iter(compaction.split_sentences(original))
+        # Kept sentences form a subsequence of the original ones.
+        assert all(sentence in remaining for sentence in compaction.split_sentences(compacted))
+    assert sum(count_tokens(text) for text in result.texts) == result.tokens_after
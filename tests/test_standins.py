@@ -0,0 +1,29 @@
+"""Fault injection in the offline stand-ins."""
+from __future__ import annotations
+
+import pytest
+import requests
+
+from videogen.standins import ServiceBehavior, StandInSettings, parse_behaviors, start_standins
+
+
+def test_parse_behaviors_reads_all_four_fields():
+    behaviors = parse_behaviors("openai=0.8:0.02,pexels-cdn=0.05:0:4000000,speech=0:0.1::429")
+    assert behaviors["openai"] == ServiceBehavior(latency=0.8, error_rate=0.02)
+    assert behaviors["pexels-cdn"] == ServiceBehavior(latency=0.05, bandwidth=4000000)
+    assert behaviors["speech"] == ServiceBehavior(error_rate=0.1, error_status=429)
+
+
+def test_parse_behaviors_rejects_extra_fields():
+    with pytest.raises(ValueError):
+        parse_behaviors("openai=0:0:0:429:1")
+
+
+def test_injected_429_carries_retry_after():
+    settings = StandInSettings(behaviors=parse_behaviors("openai=0:1::429"))
+    with start_standins(settings) as server:
+        response = requests.post(f"{server.base_url}/v1/responses", json={"model": "m", "input": "hello"}, timeout=10)
+        stats = server.stats()["openai"]
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert stats["errors"] == 1
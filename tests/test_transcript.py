@@ -0,0 +1,32 @@
+"""Time and character slicing of TimedTranscript."""
+from __future__ import annotations
+
+from videogen.transcript import TimedTranscript
+
+
+def _transcript(timings):
+    return TimedTranscript.from_entries(
+        {"text": f"line{index}", "start": start, "duration": duration}
+        for index, (start, duration) in enumerate(timings)
+    )
+
+
+def test_slice_time_keeps_earlier_captions_still_running():
+    # Rolling captions: the first entry covers [1, 3) and is still running at 2.5.
+    transcript = _transcript([(1, 2), (2, 2), (3, 2), (4, 1)])
+    window = transcript.slice_time(2.5, 4.2)
+    assert (window.first, window.last) == (0, 4)
+    assert window.text.startswith("line0")
+
+
+def test_slice_time_drops_captions_that_ended():
+    transcript = _transcript([(0, 1), (1, 1), (2, 1), (3, 1)])
+    window = transcript.slice_time(1.0, 3.0)
+    assert (window.first, window.last) == (1, 3)
+    assert window.time_range == (1.0, 3.0)
+
+
+def test_slice_time_outside_the_transcript_is_empty():
+    transcript = _transcript([(0, 1), (1, 1)])
+    assert len(transcript.slice_time(5.0, 6.0)) == 0
+    assert len(transcript.slice_time(-2.0, -1.0)) == 0
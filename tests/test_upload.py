@@ -0,0 +1,29 @@
+"""Resumable uploads against the YouTube stand-in."""
+from __future__ import annotations
+
+import os
+
+from videogen.standins import StandInSettings, start_standins
+from videogen.uploader import upload_video
+
+
+def test_resumable_upload_resumes_a_partly_kept_chunk(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(os.urandom(600_000))
+    # The stand-in keeps 200 000 bytes of each 256 KiB chunk, so the client resumes from its Range.
+    with start_standins(StandInSettings(upload_accept_bytes=200_000)) as server:
+        response = upload_video(
+            video,
+            "Title",
+            "Description",
+            tmp_path / "client_secret.json",
+            tmp_path / "token.json",
+            api_endpoint=server.environment()["VIDEOGEN_YOUTUBE_API_ENDPOINT"],
+            chunksize=256 * 1024,
+        )
+        stats = server.stats()["upload"]
+
+    assert response["status"]["uploadStatus"] == "uploaded"
+    assert response["snippet"]["title"] == "Title"
+    assert stats["requests"] == 1 + 3  # session start, then chunks from byte 0, 200 000 and 400 000
+    assert stats["bytes_in"] > 2 * 256 * 1024 + 200_000
@@ -0,0 +1,360 @@
+"""Audio helpers that read container headers instead of decoding samples."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Tuple
+import logging
+import re
+import struct
+import subprocess
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bitrates in kbps indexed by [version is MPEG-1][layer][index].
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+class FrameHeader:
+    """Decoded fields of a single MPEG audio frame header."""
+
+    __slots__ = ("version", "layer", "bitrate", "sample_rate", "padding", "channels", "length", "samples")
+
+    def __init__(self, header: int) -> None:
+        self.version = (header >> 19) & 0x3
+        layer_bits = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0x3
+        if self.version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+            raise ValueError("invalid MPEG frame header")
+        self.layer = 4 - layer_bits
+        mpeg1 = self.version == 3
+        self.bitrate = _BITRATES[(mpeg1, self.layer)][bitrate_index] * 1000
+        self.sample_rate = _SAMPLE_RATES[self.version][rate_index]
+        self.padding = (header >> 9) & 0x1
+        self.channels = 1 if ((header >> 6) & 0x3) == 3 else 2
+        if self.layer == 1:
+            self.samples = 384
+            self.length = (12 * self.bitrate // self.sample_rate + self.padding) * 4
+        else:
+            self.samples = 1152 if (self.layer == 2 or mpeg1) else 576
+            self.length = self.samples // 8 * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _audio_end(data: bytes) -> int:
+    """Offset where MPEG frames end, excluding an ID3v1 tag."""
+    return len(data) - 128 if len(data) >= 128 and data[-128:-125] == b"TAG" else len(data)
+
+
+def _parse_header(data: bytes, offset: int) -> Optional[FrameHeader]:
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+    try:
+        return FrameHeader(struct.unpack(">I", data[offset:offset + 4])[0])
+    except ValueError:
+        return None
+
+
+def _find_first_frame(data: bytes, start: int) -> Tuple[int, FrameHeader]:
+    """Locate the first frame whose successor is also a valid frame header."""
+    offset = start
+    end = _audio_end(data)
+    while offset < end - 4:
+        header = _parse_header(data, offset)
+        if header is not None:
+            following = offset + header.length
+            if following >= end or _parse_header(data, following) is not None:
+                return offset, header
+        offset += 1
+    raise ValueError("no MPEG audio frames found")
+
+
+def _xing_offset(header: FrameHeader) -> int:
+    if header.version == 3:
+        side_info = 17 if header.channels == 1 else 32
+    else:
+        side_info = 9 if header.channels == 1 else 17
+    return 4 + side_info
+
+
+def _is_tag_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """True for a Xing/Info/VBRI frame, which carries metadata rather than audio."""
+    xing = offset + _xing_offset(header)
+    return data[xing:xing + 4] in (b"Xing", b"Info") or data[offset + 36:offset + 40] == b"VBRI"
+
+
+def _vbr_frame_count(data: bytes, offset: int, header: FrameHeader) -> Optional[int]:
+    """Total frame count from a Xing/Info or VBRI tag in the first frame, if present."""
+    frame = data[offset:offset + header.length]
+    xing = _xing_offset(header)
+    if frame[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", frame[xing + 4:xing + 8])[0]
+        if flags & 0x1:
+            return struct.unpack(">I", frame[xing + 8:xing + 12])[0]
+    if frame[36:40] == b"VBRI":
+        return struct.unpack(">I", frame[50:54])[0]
+    return None
+
+
+def iter_mp3_frames(data: bytes) -> Iterator[Tuple[int, FrameHeader]]:
+    """Yield ``(offset, header)`` for each MPEG audio frame in ``data``."""
+    offset, header = _find_first_frame(data, _skip_id3v2(data))
+    end = _audio_end(data)
+    while header is not None and offset + header.length <= end:
+        yield offset, header
+        offset += header.length
+        header = _parse_header(data, offset)
+
+
+def mp3_duration(data: bytes) -> float:
+    """Duration of an MP3 stream from its Xing/VBRI tag or by walking frame headers."""
+    offset, header = _find_first_frame(data, _skip_id3v2(data))
+    frames = _vbr_frame_count(data, offset, header)
+    if frames is not None:
+        return frames * header.duration
+    return sum(frame.duration for _, frame in iter_mp3_frames(data))
+
+
+def concat_mp3(parts: Sequence[bytes]) -> bytes:
+    """Join MP3 streams at frame level without re-encoding.
+
+    ID3 tags and the Xing/Info/VBRI metadata frame of every part are dropped,
+    since their sizes and frame counts would be wrong for the joined stream.
+    """
+    joined = bytearray()
+    for data in parts:
+        for index, (offset, header) in enumerate(iter_mp3_frames(data)):
+            if index == 0 and _is_tag_frame(data, offset, header):
+                continue
+            joined += data[offset:offset + header.length]
+    return bytes(joined)
+
+
+def wav_duration(data: bytes) -> float:
+    """Duration of a RIFF/WAVE file from its ``fmt`` and ``data`` chunk headers."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a WAVE file")
+    offset = 12
+    byte_rate = None
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack("<4sI", data[offset:offset + 8])
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[offset + 16:offset + 20])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                break
+            # Streamed WAVs may carry a placeholder size; fall back to what is on disk.
+            available = len(data) - offset - 8
+            return min(size, available) / byte_rate
+        offset += 8 + size + (size & 1)
+    raise ValueError("WAVE file has no fmt/data chunks")
+
+
+def _wav_chunks(data: bytes) -> Tuple[bytes, bytes]:
+    """Return the raw ``fmt`` chunk body and the sample data of a WAVE file."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a WAVE file")
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack("<4sI", data[offset:offset + 8])
+        if chunk_id == b"fmt ":
+            fmt = data[offset + 8:offset + 8 + size]
+        elif chunk_id == b"data" and fmt is not None:
+            return fmt, data[offset + 8:offset + 8 + min(size, len(data) - offset - 8)]
+        offset += 8 + size + (size & 1)
+    raise ValueError("WAVE file has no fmt/data chunks")
+
+
+def _wav_bytes(fmt: bytes, samples: bytes) -> bytes:
+    header = struct.pack("<4sI4s4sI", b"RIFF", 4 + 8 + len(fmt) + 8 + len(samples), b"WAVE", b"fmt ", len(fmt))
+    return header + fmt + struct.pack("<4sI", b"data", len(samples)) + samples
+
+
+def pcm_to_wav(samples: bytes, sample_rate: int = 24000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Wrap raw little-endian PCM (OpenAI's ``pcm`` format by default) in a WAV header."""
+    block_align = channels * sample_width
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8)
+    return _wav_bytes(fmt, samples)
+
+
+def concat_wav(parts: Sequence[bytes]) -> bytes:
+    """Join WAVE files that share one sample format."""
+    fmt = None
+    samples = bytearray()
+    for data in parts:
+        part_fmt, part_samples = _wav_chunks(data)
+        if fmt is not None and part_fmt != fmt:
+            raise ValueError("WAVE parts use different sample formats")
+        fmt = part_fmt
+        samples += part_samples
+    if fmt is None:
+        raise ValueError("no WAVE parts to join")
+    return _wav_bytes(fmt, bytes(samples))
+
+
+_ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+
+
+def _is_adts(data: bytes, offset: int = 0) -> bool:
+    return offset + 7 <= len(data) and data[offset] == 0xFF and (data[offset + 1] & 0xF6) == 0xF0
+
+
+def iter_adts_frames(data: bytes) -> Iterator[Tuple[int, int, float]]:
+    """Yield ``(offset, length, duration)`` for each ADTS AAC frame."""
+    offset = _skip_id3v2(data)
+    while _is_adts(data, offset):
+        rate_index = (data[offset + 2] >> 2) & 0xF
+        length = ((data[offset + 3] & 0x3) << 11) | (data[offset + 4] << 3) | (data[offset + 5] >> 5)
+        if rate_index >= len(_ADTS_SAMPLE_RATES) or length < 7 or offset + length > len(data):
+            break
+        blocks = (data[offset + 6] & 0x3) + 1
+        yield offset, length, blocks * 1024 / _ADTS_SAMPLE_RATES[rate_index]
+        offset += length
+
+
+def adts_duration(data: bytes) -> float:
+    total = sum(duration for _, _, duration in iter_adts_frames(data))
+    if not total:
+        raise ValueError("no ADTS frames found")
+    return total
+
+
+def concat_adts(parts: Sequence[bytes]) -> bytes:
+    """Join ADTS AAC streams frame by frame without re-encoding."""
+    joined = bytearray()
+    for data in parts:
+        for offset, length, _ in iter_adts_frames(data):
+            joined += data[offset:offset + length]
+    return bytes(joined)
+
+
+def flac_duration(data: bytes) -> float:
+    """Duration from the FLAC STREAMINFO block."""
+    if data[:4] != b"fLaC" or data[4] & 0x7F != 0:
+        raise ValueError("not a FLAC file")
+    packed = int.from_bytes(data[18:26], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:  # streamed FLAC leaves the total unset
+        raise ValueError("FLAC STREAMINFO has no sample count")
+    return total_samples / sample_rate
+
+
+def _last_ogg_page(data: bytes) -> int:
+    """Offset of the last real Ogg page header; ``OggS`` can also occur inside packet data."""
+    end = len(data)
+    while True:
+        page = data.rfind(b"OggS", 0, end)
+        if page < 0:
+            raise ValueError("no Ogg page header")
+        # Stream structure version 0, only the three defined header-type flags,
+        # and a segment table that fits in the file.
+        if page + 27 <= len(data) and data[page + 4] == 0 and data[page + 5] & 0xF8 == 0 and page + 27 + data[page + 26] <= len(data):
+            return page
+        end = page + 3
+
+
+def ogg_opus_duration(data: bytes) -> float:
+    """Duration from the granule position of the last Ogg page, minus Opus pre-skip."""
+    head = data.find(b"OpusHead")
+    if head < 0 or head + 12 > len(data):
+        raise ValueError("not an Ogg Opus file")
+    last_page = _last_ogg_page(data)
+    pre_skip = struct.unpack("<H", data[head + 10:head + 12])[0]
+    granule = struct.unpack("<q", data[last_page + 6:last_page + 14])[0]
+    if granule <= 0:
+        raise ValueError("Ogg page has no granule position")
+    return (granule - pre_skip) / 48000
+
+
+# OpenAI TTS response formats and the file extension each is written with.
+# Raw PCM is wrapped in a WAV header so every downstream reader understands it.
+AUDIO_EXTENSIONS = {"mp3": "mp3", "opus": "opus", "aac": "aac", "flac": "flac", "wav": "wav", "pcm": "wav"}
+
+# Formats whose chunks can be joined losslessly by :func:`join_audio_files`.
+JOINABLE_FORMATS = {"mp3", "aac", "wav", "pcm"}
+
+# Formats an MP4 container can carry unchanged, so rendering can copy the stream.
+MUXABLE_FORMATS = {"mp3", "aac"}
+
+
+def join_audio_files(parts: Sequence[Path], destination: Path, audio_format: str) -> Path:
+    """Join separately synthesized chunks into ``destination`` without re-encoding."""
+    data = [Path(part).read_bytes() for part in parts]
+    if audio_format == "mp3":
+        joined = concat_mp3(data)
+    elif audio_format == "aac":
+        joined = concat_adts(data)
+    elif audio_format in ("wav", "pcm"):
+        joined = concat_wav(data)
+    else:
+        raise ValueError(f"Cannot join {audio_format} audio without re-encoding")
+    destination.unlink(missing_ok=True)
+    destination.write_bytes(joined)
+    return destination
+
+
+def ffmpeg_duration(path: Path) -> float:
+    """Decode ``path`` with moviepy's ffmpeg and return how far it got.
+
+    ffprobe is not shipped with imageio-ffmpeg, so the bundled ffmpeg is used;
+    decoding also works when the header carries no duration at all.
+    """
+    from moviepy.config import get_setting
+
+    stderr = subprocess.run(
+        [get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostdin", "-i", str(path), "-f", "null", "-"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    reached = re.findall(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if not reached:
+        raise ValueError(f"ffmpeg reported no duration for {path}")
+    hours, minutes, seconds = reached[-1]
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_duration(path: Path) -> float:
+    """Return the duration of an audio file in seconds without decoding it.
+
+    MP3, WAV, ADTS AAC, FLAC and Ogg Opus headers are parsed in pure Python;
+    anything else, or a file those parsers reject, is decoded by :func:`ffmpeg_duration`.
+    """
+    data = Path(path).read_bytes()
+    try:
+        if data[:4] == b"RIFF":
+            return wav_duration(data)
+        if data[:4] == b"fLaC":
+            return flac_duration(data)
+        if data[:4] == b"OggS":
+            return ogg_opus_duration(data)
+        if _is_adts(data, _skip_id3v2(data)):
+            return adts_duration(data)
+        if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+            return mp3_duration(data)
+    except (ValueError, struct.error) as exc:
+        logger.debug("Header probe failed for %s (%s), decoding with ffmpeg", path, exc)
+    return ffmpeg_duration(path)
@@ -0,0 +1,201 @@
+"""Content-addressed on-disk cache with TTL and LRU eviction."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from .config import ensure_directory
+
+
+logger = logging.getLogger(__name__)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Materialise ``source`` at ``destination`` by hard link, falling back to a copy.
+
+    The link is made under a temporary name and renamed over ``destination``,
+    so concurrent writers of the same destination cannot trip over each other.
+    A missing ``source`` raises :class:`FileNotFoundError`.
+    """
+    ensure_directory(destination.parent)
+    temporary = destination.with_name(f".tmp-{destination.name}.{os.getpid()}.{threading.get_ident()}")
+    temporary.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(source, temporary)
+        except FileNotFoundError:
+            raise
+        except OSError:  # another filesystem, or links unsupported
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, destination)
+    finally:
+        # rename() is a no-op when both names already link the same file.
+        temporary.unlink(missing_ok=True)
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Blob store under ``directory`` indexed by a small SQLite database.
+
+    Entries older than ``ttl`` seconds are treated as misses, and the least
+    recently used entries are evicted once the total size exceeds ``max_bytes``.
+    The index is opened per operation so the cache can be shared between
+    threads and processes on the same host.
+    """
+
+    def __init__(self, directory: Path, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> None:
+        self.directory = ensure_directory(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = self.directory / "index.sqlite3"
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self._index_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _blob_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _live_path(self, key: str) -> Optional[Path]:
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+            path = self._blob_path(key)
+            if row is None or not path.exists():
+                return None
+            if self.ttl is not None and now - row[0] > self.ttl:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                path.unlink(missing_ok=True)
+                return None
+            connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+        return path
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """Return the path of a live entry and mark it as recently used."""
+        path = self._live_path(key)
+        self._count(path is not None)
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:  # evicted by another process in between
+            return None
+
+    def get_json(self, key: str) -> Any:
+        data = self.get(key)
+        return json.loads(data) if data is not None else None
+
+    def _store(self, key: str, write: Callable[[Path], None]) -> Path:
+        path = self._blob_path(key)
+        ensure_directory(path.parent)
+        descriptor, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        os.close(descriptor)
+        try:
+            write(Path(temp_name))
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self._record(key, path.stat().st_size)
+        return path
+
+    def set(self, key: str, data: bytes) -> Path:
+        """Store ``data`` atomically under ``key``."""
+        return self._store(key, lambda temp: temp.write_bytes(data))
+
+    def set_json(self, key: str, value: Any) -> Path:
+        return self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def set_file(self, key: str, source: Path) -> Path:
+        """Copy an existing file into the cache."""
+        return self._store(key, lambda temp: shutil.copyfile(source, temp))
+
+    def copy_to(self, key: str, destination: Path) -> bool:
+        """Materialise a cached entry at ``destination``; returns ``False`` on a miss.
+
+        A hard link is used when the cache and destination share a filesystem,
+        falling back to a copy. Writers must replace ``destination`` rather than
+        truncate it so a linked entry is never modified in place.
+        """
+        path = self._live_path(key)
+        if path is not None:
+            try:
+                link_or_copy(path, destination)
+            except FileNotFoundError:  # evicted by another process in between
+                path = None
+        self._count(path is not None)
+        return path is not None
+
+    def _record(self, key: str, size: int) -> None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, size, now, now),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries and trim the cache to ``max_bytes``."""
+        removed = []
+        with self._connect() as connection:
+            if self.ttl is not None:
+                cutoff = time.time() - self.ttl
+                removed += [row[0] for row in connection.execute("SELECT key FROM entries WHERE created < ?", (cutoff,))]
+                connection.execute("DELETE FROM entries WHERE created < ?", (cutoff,))
+            if self.max_bytes is not None:
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    lru = []
+                    for key, size in connection.execute("SELECT key, size FROM entries ORDER BY last_used ASC"):
+                        if total <= self.max_bytes:
+                            break
+                        lru.append(key)
+                        total -= size
+                    connection.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in lru])
+                    removed += lru
+        for key in removed:
+            self._blob_path(key).unlink(missing_ok=True)
+        if removed:
+            logger.info("Evicted %d entries from cache %s", len(removed), self.directory)
+        return len(removed)
@@ -1,19 +1,29 @@
 """Command line entry point for the VideoGen pipeline."""
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Tuple
 import argparse
+import asyncio
+import json
 import logging
 
-from moviepy.editor import AudioFileClip
-
-from .config import VideoGenConfig
+from .audio import AUDIO_EXTENSIONS, probe_duration
+from .cache import DiskCache
+from .compaction import compact_transcripts
+from .config import VideoGenConfig, parse_resolution
+from .estimate import estimate_job, load_history, parse_prices
+from .library import MediaLibrary
 from .youtube import gather_transcripts
-from .openai_utils import OpenAIWorkflow
+from .metrics import configure_metrics, get_metrics
+from .normalize import normalize_transcripts
+from .openai_utils import AsyncOpenAIWorkflow, OpenAIWorkflow, SegmentPlan
 from .pexels import PexelsClient
 from .project import VideoProject, create_project_segments
+from .ratelimit import configure_limiter, parse_limits
 from .render import render_project
+from .tracing import configure_tracer, span
 from .uploader import upload_video
 
 
@@ -21,72 +31,315 @@ logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def build_project(urls: List[str], prompt: str, config: VideoGenConfig, project_name: str, render: bool, upload: bool, upload_title: str | None, upload_description: str | None, privacy_status: str) -> VideoProject:
-    transcripts = gather_transcripts(urls)
-    workflow = OpenAIWorkflow(
-        api_key=config.openai_api_key,
-        model=config.openai_model,
-        tts_model=config.openai_tts_model,
-        tts_voice=config.openai_tts_voice,
-    )
-    plans = workflow.generate_script_outline([transcript.text for transcript in transcripts], prompt)
+def load_source_texts(urls: List[str], config: VideoGenConfig) -> List[str]:
+    """Fetch, and optionally normalize, the transcripts the outline is built from."""
+    transcript_cache = None
+    if config.use_cache:
+        transcript_cache = DiskCache(
+            config.cache_dir / "transcripts",
+            ttl=config.transcript_cache_ttl,
+            max_bytes=config.transcript_cache_max_bytes,
+        )
+    with span("transcripts", "youtube", count=len(urls)):
+        transcripts = gather_transcripts(urls, max_workers=config.transcript_workers, cache=transcript_cache, base_url=config.transcript_base_url)
+    if config.normalize_captions:
+        with span("normalize", "text"):
+            transcripts, _ = normalize_transcripts(transcripts)
+    return [transcript.text for transcript in transcripts]
 
-    speech_dir = config.working_dir / "speech"
-    video_dir = config.working_dir / "video"
-    speech_paths: List[Path] = []
-    video_paths: List[Path | None] = []
-    durations: List[float] = []
 
-    pexels_client = PexelsClient(config.pexels_api_key, video_dir)
-
-    for index, plan in enumerate(plans):
-        speech_path = speech_dir / f"segment_{index:02d}.mp3"
-        workflow.generate_speech(plan.script, speech_path)
-        with AudioFileClip(str(speech_path)) as audio_clip:
-            duration = float(audio_clip.duration)
-        query = " ".join(plan.keywords) or plan.title
-        pexels_video = pexels_client.search_and_download(query)
-        video_path = pexels_video.filepath if pexels_video else None
-        speech_paths.append(speech_path)
-        video_paths.append(video_path)
-        durations.append(duration)
-        logger.info("Prepared segment %d with duration %.2fs", index + 1, duration)
+def _summary_cache(config: VideoGenConfig) -> DiskCache | None:
+    return DiskCache(config.cache_dir / "summaries", max_bytes=config.summary_cache_max_bytes) if config.use_cache else None
+
+
+def _tts_cache(config: VideoGenConfig) -> DiskCache | None:
+    return DiskCache(config.cache_dir / "tts", max_bytes=config.tts_cache_max_bytes) if config.use_cache else None
+
 
+def _log_cache_stats(name: str, cache: DiskCache | MediaLibrary | None) -> None:
+    if cache is not None:
+        logger.info("%s cache: %d hits, %d misses", name, cache.hits, cache.misses)
+
+
+def _log_download_stats(client: PexelsClient) -> None:
+    if client.downloads:
+        logger.info(
+            "Stock footage: %d downloads, %.1f MB in %.1fs (%.2f MB/s)",
+            client.downloads,
+            client.downloaded_bytes / 1e6,
+            client.download_seconds,
+            client.throughput / 1e6,
+        )
+
+
+def _speech_path(config: VideoGenConfig, index: int) -> Path:
+    return config.working_dir / "speech" / f"segment_{index:02d}.{AUDIO_EXTENSIONS[config.tts_format]}"
+
+
+def _stock_query(plan: SegmentPlan) -> str:
+    return " ".join(plan.keywords) or plan.title
+
+
+def finish_project(plans: List[SegmentPlan], speech_paths: List[Path], video_paths: List[Path | None], durations: List[float], prompt: str, config: VideoGenConfig, project_name: str, render: bool, upload: bool, upload_title: str | None, upload_description: str | None, privacy_status: str) -> VideoProject:
+    """Save the project file, then render and upload it if requested."""
     segments = create_project_segments(plans, speech_paths, video_paths, durations)
 
     render_path = config.output_dir / f"{project_name}.mp4"
-    project = VideoProject(name=project_name, segments=segments, render_path=render_path)
+    project = VideoProject(name=project_name, segments=segments, render_path=render_path, metrics=get_metrics().summary())
     project_file = config.output_dir / f"{project_name}.json"
     project.save(project_file)
 
     if render:
-        render_project(project.segments, render_path)
+        with span("render", "render", segments=len(project.segments)), get_metrics().measure("local", "render"):
+            render_project(
+                project.segments,
+                render_path,
+                fps=config.render_fps,
+                audio_format=config.tts_format,
+                size=(config.render_width, config.render_height),
+            )
 
     if upload:
         upload_title = upload_title or project_name
         upload_description = upload_description or prompt
         token_path = config.working_dir / "youtube_token.json"
-        upload_video(render_path, upload_title, upload_description, config.youtube_client_secret, token_path, privacy_status=privacy_status)
+        upload_video(render_path, upload_title, upload_description, config.youtube_client_secret, token_path, privacy_status=privacy_status, api_endpoint=config.youtube_api_endpoint)
 
+    if render or upload:  # refresh the accounting with the upload and the total wall time
+        project.metrics = get_metrics().summary()
+        project.save(project_file)
     return project
 
 
+def prepare_segments(plans: Iterable[SegmentPlan], workflow: OpenAIWorkflow, pexels_client: PexelsClient, config: VideoGenConfig) -> Tuple[List[SegmentPlan], List[Path], List[Path | None], List[float]]:
+    """Narrate each segment and fetch its stock footage.
+
+    Work for a plan is submitted as soon as ``plans`` yields it, so a streamed
+    outline overlaps with narration and downloads of earlier segments. Stock
+    footage has its own pool; the client bounds searches and downloads.
+    """
+    received: List[SegmentPlan] = []
+    speech_paths: List[Path] = []
+    video_paths: List[Path | None] = []
+    durations: List[float] = []
+    with ThreadPoolExecutor(max_workers=max(1, config.tts_workers)) as tts_pool, ThreadPoolExecutor(max_workers=max(1, config.pexels_search_workers + config.pexels_download_workers)) as stock_pool:
+        speech_futures = []
+        video_futures = []
+        try:
+            for index, plan in enumerate(plans):
+                received.append(plan)
+                speech_futures.append(tts_pool.submit(workflow.generate_speech, plan.script, _speech_path(config, index)))
+                video_futures.append(stock_pool.submit(pexels_client.search_and_download, _stock_query(plan)))
+            for index, (speech_future, video_future) in enumerate(zip(speech_futures, video_futures)):
+                speech_path = speech_future.result()
+                duration = probe_duration(speech_path)
+                pexels_video = video_future.result()
+                speech_paths.append(speech_path)
+                video_paths.append(pexels_video.filepath if pexels_video else None)
+                durations.append(duration)
+                logger.info("Prepared segment %d with duration %.2fs", index + 1, duration)
+        except BaseException:
+            # The run is failing; do not pay for narration nobody will use.
+            for future in speech_futures + video_futures:
+                future.cancel()
+            raise
+    _log_cache_stats("TTS", workflow.tts_cache)
+    _log_cache_stats("Pexels search", pexels_client.search_cache)
+    _log_cache_stats("Media library", pexels_client.library)
+    _log_download_stats(pexels_client)
+    return received, speech_paths, video_paths, durations
+
+
+def build_project(urls: List[str], prompt: str, config: VideoGenConfig, project_name: str, render: bool, upload: bool, upload_title: str | None, upload_description: str | None, privacy_status: str, texts: List[str] | None = None) -> VideoProject:
+    if texts is None:
+        texts = load_source_texts(urls, config)
+    workflow = OpenAIWorkflow(
+        api_key=config.openai_api_key,
+        model=config.openai_model,
+        tts_model=config.openai_tts_model,
+        tts_voice=config.openai_tts_voice,
+        tts_cache=_tts_cache(config),
+        structured_output=config.structured_outline,
+        split_sentences=config.tts_split_sentences,
+        chunk_workers=config.tts_chunk_workers,
+        tts_format=config.tts_format,
+        base_url=config.openai_base_url,
+    )
+    plans: Iterable[SegmentPlan]
+    if config.outline_mode == "map-reduce":
+        plans = workflow.generate_script_outline_map_reduce(
+            texts,
+            prompt,
+            chunk_tokens=config.map_chunk_tokens,
+            max_workers=config.map_workers,
+            cache=_summary_cache(config),
+        )
+    else:
+        compaction = compact_transcripts(texts, config.outline_token_budget, model=config.openai_model)
+        if config.stream_outline:
+            plans = workflow.stream_script_outline(compaction.texts, prompt)
+        else:
+            plans = workflow.generate_script_outline(compaction.texts, prompt)
+
+    pexels_client = PexelsClient.from_config(config)
+    plans, speech_paths, video_paths, durations = prepare_segments(plans, workflow, pexels_client, config)
+
+    return finish_project(plans, speech_paths, video_paths, durations, prompt, config, project_name, render, upload, upload_title, upload_description, privacy_status)
+
+
+async def build_project_async(urls: List[str], prompt: str, config: VideoGenConfig, project_name: str, render: bool, upload: bool, upload_title: str | None, upload_description: str | None, privacy_status: str, texts: List[str] | None = None) -> VideoProject:
+    """Event-loop version of :func:`build_project`.
+
+    OpenAI calls go through :class:`AsyncOpenAIWorkflow`; each segment's
+    narration and stock-footage download run concurrently within one task, so
+    segments interleave freely. Blocking steps run in worker threads.
+    ``texts`` skips fetching transcripts the caller already loaded.
+    """
+    if texts is None:
+        texts = await asyncio.to_thread(load_source_texts, urls, config)
+    workflow = AsyncOpenAIWorkflow(
+        api_key=config.openai_api_key,
+        model=config.openai_model,
+        tts_model=config.openai_tts_model,
+        tts_voice=config.openai_tts_voice,
+        tts_cache=_tts_cache(config),
+        structured_output=config.structured_outline,
+        split_sentences=config.tts_split_sentences,
+        chunk_workers=config.tts_chunk_workers,
+        tts_format=config.tts_format,
+        base_url=config.openai_base_url,
+    )
+    pexels_client = PexelsClient.from_config(config)
+    tts_slots = asyncio.Semaphore(max(1, config.tts_workers))
+
+    async def narrate(index: int, plan: SegmentPlan) -> Tuple[Path, float]:
+        async with tts_slots:
+            speech_path = await workflow.generate_speech(plan.script, _speech_path(config, index))
+        return speech_path, await asyncio.to_thread(probe_duration, speech_path)
+
+    async def prepare(index: int, plan: SegmentPlan) -> Tuple[Path, Path | None, float]:
+        (speech_path, duration), pexels_video = await asyncio.gather(
+            narrate(index, plan),
+            asyncio.to_thread(pexels_client.search_and_download, _stock_query(plan)),
+        )
+        logger.info("Prepared segment %d with duration %.2fs", index + 1, duration)
+        return speech_path, pexels_video.filepath if pexels_video else None, duration
+
+    plans: List[SegmentPlan] = []
+    tasks: List[asyncio.Task] = []
+    try:
+        if config.outline_mode == "map-reduce":
+            plans = await workflow.generate_script_outline_map_reduce(
+                texts,
+                prompt,
+                chunk_tokens=config.map_chunk_tokens,
+                max_workers=config.map_workers,
+                cache=_summary_cache(config),
+            )
+        else:
+            compaction = compact_transcripts(texts, config.outline_token_budget, model=config.openai_model)
+            if config.stream_outline:
+                async for plan in workflow.stream_script_outline(compaction.texts, prompt):
+                    tasks.append(asyncio.create_task(prepare(len(plans), plan)))
+                    plans.append(plan)
+            else:
+                plans = await workflow.generate_script_outline(compaction.texts, prompt)
+        if not tasks:
+            tasks = [asyncio.create_task(prepare(index, plan)) for index, plan in enumerate(plans)]
+
+        prepared = await asyncio.gather(*tasks)
+    except BaseException:
+        # Stop the segments still in flight instead of leaving them running unawaited.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    _log_cache_stats("TTS", workflow.tts_cache)
+    _log_cache_stats("Pexels search", pexels_client.search_cache)
+    _log_cache_stats("Media library", pexels_client.library)
+    _log_download_stats(pexels_client)
+    speech_paths = [item[0] for item in prepared]
+    video_paths = [item[1] for item in prepared]
+    durations = [item[2] for item in prepared]
+
+    return await asyncio.to_thread(finish_project, plans, speech_paths, video_paths, durations, prompt, config, project_name, render, upload, upload_title, upload_description, privacy_status)
+
+
 def main(argv: List[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="Generate AI-assisted videos from YouTube transcripts.")
     parser.add_argument("urls", nargs="+", help="YouTube video URLs")
     parser.add_argument("--prompt", required=True, help="Creative brief for the new video")
     parser.add_argument("--project", default="videogen_project", help="Name of the project")
     parser.add_argument("--render", action="store_true", help="Render the final video")
+    parser.add_argument("--resolution", type=parse_resolution, help="Render size as WIDTHxHEIGHT; stock footage is fetched at the smallest rendition covering it")
+    parser.add_argument("--fps", type=int, help="Render frame rate")
     parser.add_argument("--upload", action="store_true", help="Upload the rendered video to YouTube")
     parser.add_argument("--privacy", default="unlisted", help="YouTube privacy status")
     parser.add_argument("--upload-title", help="Title for the YouTube upload")
     parser.add_argument("--upload-description", help="Description for the YouTube upload")
+    parser.add_argument("--transcript-workers", type=int, help="Number of transcripts fetched concurrently")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk caches and always hit the network")
+    parser.add_argument("--token-budget", type=int, help="Maximum transcript tokens sent for the outline (0 disables compaction)")
+    parser.add_argument("--outline-mode", choices=["single", "map-reduce"], help="Outline in one call, or summarize chunks first and outline from the summaries")
+    parser.add_argument("--map-workers", type=int, help="Concurrent chunk summaries in map-reduce mode")
+    parser.add_argument("--tts-workers", type=int, help="Maximum concurrent text-to-speech requests")
+    parser.add_argument("--search-workers", type=int, help="Maximum concurrent Pexels search requests")
+    parser.add_argument("--download-workers", type=int, help="Maximum concurrent stock-footage downloads")
+    parser.add_argument("--tts-format", choices=sorted(AUDIO_EXTENSIONS), help="Narration audio format requested from the TTS API")
+    parser.add_argument("--tts-split", action="store_true", help="Synthesize long scripts sentence chunk by chunk in parallel and join them")
+    parser.add_argument("--stream-outline", action="store_true", help="Stream the outline and start narration and downloads per segment as it arrives")
+    parser.add_argument("--no-json-schema", action="store_true", help="Do not constrain the outline with a JSON schema (for models without structured outputs)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the pipeline on an asyncio event loop with AsyncOpenAI")
+    parser.add_argument("--trace", type=Path, help="Write a Chrome trace-event JSON timeline of the run to this file")
+    parser.add_argument("--otlp-endpoint", help="Also export the spans to this OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces")
+    parser.add_argument("--metrics-textfile", type=Path, help="Write run metrics in Prometheus text format for the node-exporter textfile collector")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch transcripts and print the expected cost and duration without calling paid APIs")
+    parser.add_argument("--max-cost", type=float, help="Refuse to run (exit status 2) when the estimated API cost in USD exceeds this")
+    parser.add_argument("--json", dest="as_json", action="store_true", help="Print the dry-run estimate as JSON")
+    parser.add_argument("--raw-captions", action="store_true", help="Send captions to the model without de-duplication or tag stripping")
 
     args = parser.parse_args(argv)
 
     config = VideoGenConfig.from_environment()
+    configure_limiter(config.cache_dir / "ratelimit.sqlite3", parse_limits(config.rate_limits))
+    if args.transcript_workers:
+        config.transcript_workers = args.transcript_workers
+    if args.no_cache:
+        config.use_cache = False
+    if args.raw_captions:
+        config.normalize_captions = False
+    if args.token_budget is not None:
+        config.outline_token_budget = args.token_budget
+    if args.outline_mode:
+        config.outline_mode = args.outline_mode
+    if args.map_workers:
+        config.map_workers = args.map_workers
+    if args.tts_workers:
+        config.tts_workers = args.tts_workers
+    if args.tts_split:
+        config.tts_split_sentences = True
+    if args.resolution:
+        config.render_width, config.render_height = args.resolution
+    if args.fps:
+        config.render_fps = args.fps
+    if args.search_workers:
+        config.pexels_search_workers = args.search_workers
+    if args.download_workers:
+        config.pexels_download_workers = args.download_workers
+    if args.tts_format:
+        config.tts_format = args.tts_format
+    if args.stream_outline:
+        config.stream_outline = True
+    if args.no_json_schema:
+        config.structured_outline = False
+    if args.trace:
+        config.trace_path = args.trace
+    if args.otlp_endpoint:
+        config.otlp_endpoint = args.otlp_endpoint
+    if args.metrics_textfile:
+        config.metrics_textfile = args.metrics_textfile
 
-    build_project(
+    options = dict(
         urls=args.urls,
         prompt=args.prompt,
         config=config,
@@ -97,6 +350,43 @@ def main(argv: List[str] | None = None) -> None:
         upload_description=args.upload_description,
         privacy_status=args.privacy,
     )
+    # Configured before the estimate so the transcripts it fetches, which the
+    # build reuses, are traced and counted.
+    tracer = configure_tracer(enabled=bool(config.trace_path or config.otlp_endpoint))
+    metrics = configure_metrics()
+    try:
+        if args.dry_run or args.max_cost is not None:
+            with span("estimate", "pipeline", project=args.project):
+                options["texts"] = texts = load_source_texts(args.urls, config)
+                estimate = estimate_job(
+                    texts,
+                    args.prompt,
+                    config,
+                    history=load_history(config.output_dir),
+                    render=args.render,
+                    upload=args.upload,
+                    prices=parse_prices(config.prices),
+                )
+            if args.dry_run or estimate.total_cost > (args.max_cost or 0.0):
+                print(json.dumps(estimate.to_dict(), indent=2) if args.as_json else estimate.report())
+            if args.max_cost is not None and estimate.total_cost > args.max_cost:
+                logger.error("Estimated cost $%.4f exceeds --max-cost $%.4f", estimate.total_cost, args.max_cost)
+                raise SystemExit(2)
+            if args.dry_run:
+                return
+
+        with span("build_project", "pipeline", project=args.project, use_async=args.use_async):
+            if args.use_async:
+                asyncio.run(build_project_async(**options))
+            else:
+                build_project(**options)
+    finally:
+        if config.trace_path:
+            tracer.write_chrome_trace(config.trace_path)
+        if config.otlp_endpoint:
+            tracer.export_otlp(config.otlp_endpoint)
+        if config.metrics_textfile:
+            metrics.write_prometheus(config.metrics_textfile, {"project": args.project})
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,214 @@
+"""Extractive compaction that fits transcripts into a token budget."""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import logging
+import math
+import re
+import zlib
+
+try:  # optional dependency: vectorized scoring when NumPy is installed (moviepy pulls it in)
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from .tokens import count_tokens, count_tokens_many
+
+
+logger = logging.getLogger(__name__)
+
+
+_SENTENCE_RE = re.compile(r"[^.!?。…]+(?:[.!?。…]+|$)")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Auto-captions rarely carry punctuation; longer runs are split into pseudo-sentences.
+MAX_SENTENCE_WORDS = 40
+# Relative boost for sentences at the very start and end of each transcript.
+POSITION_WEIGHT = 0.3
+
+
+@dataclass
+class CompactionResult:
+    """Compacted transcripts plus the sizes used to report the compression."""
+
+    texts: List[str]
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of the original tokens that were kept."""
+        return self.tokens_after / self.tokens_before if self.tokens_before else 1.0
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, chunking long unpunctuated runs."""
+    sentences: List[str] = []
+    for match in _SENTENCE_RE.finditer(text):
+        words = match.group(0).split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return [sentence for sentence in sentences if sentence]
+
+
+def _position_boosts(total: int) -> List[float]:
+    """Weight factor per position, highest at the very start and end of a transcript."""
+    boosts = []
+    for position in range(total):
+        relative = position / (total - 1) if total > 1 else 0.0
+        boosts.append(1.0 + POSITION_WEIGHT * (abs(relative - 0.5) * 2) ** 2)
+    return boosts
+
+
+def score_sentences(documents: List[List[str]]) -> List[List[float]]:
+    """Score every sentence by mean TF-IDF weight and position in its transcript.
+
+    Each sentence is treated as a document for the IDF statistics, which are
+    pooled across all transcripts so that terms shared by every source do not
+    dominate the selection. With NumPy the term and document frequencies of
+    all sentences are computed in a few array operations.
+    """
+    tokenized = [[[word.casefold() for word in _WORD_RE.findall(sentence)] for sentence in sentences] for sentences in documents]
+    if np is None:
+        return _score_counters(tokenized)
+    return _score_arrays(tokenized)
+
+
+def _score_counters(tokenized: List[List[List[str]]]) -> List[List[float]]:
+    """Pure-Python scoring: one ``Counter`` per sentence feeds both frequencies."""
+    sentence_count = sum(len(sentences) for sentences in tokenized)
+    counted = [[Counter(words) for words in sentences] for sentences in tokenized]
+    document_frequency: Counter = Counter()
+    for sentences in counted:
+        for counts in sentences:
+            document_frequency.update(counts.keys())
+    idf = {word: math.log((1 + sentence_count) / (1 + frequency)) + 1.0 for word, frequency in document_frequency.items()}
+
+    scores: List[List[float]] = []
+    for sentences, counts_per_sentence in zip(tokenized, counted):
+        scores.append([
+            sum((1.0 + math.log(count)) * idf[word] for word, count in counts.items()) / math.sqrt(len(words)) * boost if words else 0.0
+            for words, counts, boost in zip(sentences, counts_per_sentence, _position_boosts(len(sentences)))
+        ])
+    return scores
+
+
+def _score_arrays(tokenized: List[List[List[str]]]) -> List[List[float]]:
+    """NumPy scoring over flat (sentence, word id) arrays."""
+    vocabulary: Dict[str, int] = {}
+    word_ids = [vocabulary.setdefault(word, len(vocabulary)) for sentences in tokenized for words in sentences for word in words]
+    lengths = [len(words) for sentences in tokenized for words in sentences]
+    boosts = [boost for sentences in tokenized for boost in _position_boosts(len(sentences))]
+    sentence_count = len(lengths)
+    vocabulary_size = max(1, len(vocabulary))
+
+    length = np.array(lengths, dtype=np.int64)
+    sentence_of_word = np.repeat(np.arange(sentence_count, dtype=np.int64), length)
+    # Each distinct (sentence, word) pair once, with its term count.
+    pairs, counts = np.unique(sentence_of_word * vocabulary_size + np.array(word_ids, dtype=np.int64), return_counts=True)
+    pair_sentence, pair_word = np.divmod(pairs, vocabulary_size)
+    document_frequency = np.bincount(pair_word, minlength=vocabulary_size)
+    idf = np.log((1 + sentence_count) / (1 + document_frequency)) + 1.0
+    totals = np.bincount(pair_sentence, weights=(1.0 + np.log(counts)) * idf[pair_word], minlength=sentence_count)
+    weights = np.divide(totals, np.sqrt(length), out=np.zeros(sentence_count), where=length > 0) * np.array(boosts)
+
+    scores: List[List[float]] = []
+    start = 0
+    for sentences in tokenized:
+        scores.append(weights[start:start + len(sentences)].tolist())
+        start += len(sentences)
+    return scores
+
+
+def compact_transcripts(texts: List[str], budget: Optional[int], model: Optional[str] = None) -> CompactionResult:
+    """Keep the highest-scoring sentences until ``budget`` tokens are used.
+
+    Selected sentences are emitted in their original order. A falsy budget or
+    input that already fits is returned unchanged.
+    """
+    texts = list(texts)
+    tokens_before = sum(count_tokens(text, model) for text in texts)
+    if not budget or tokens_before <= budget:
+        return CompactionResult(texts=texts, tokens_before=tokens_before, tokens_after=tokens_before)
+
+    documents = [split_sentences(text) for text in texts]
+    sentences = [sentence for document in documents for sentence in document]
+    scores = [score for document_scores in score_sentences(documents) for score in document_scores]
+    costs = [tokens + 1 for tokens in count_tokens_many(sentences, model)]
+
+    kept = [False] * len(sentences)
+    used = 0
+    for index in sorted(range(len(sentences)), key=scores.__getitem__, reverse=True):
+        if used + costs[index] > budget:
+            continue
+        kept[index] = True
+        used += costs[index]
+
+    compacted = []
+    start = 0
+    for document in documents:
+        compacted.append(" ".join(sentence for sentence, keep in zip(document, kept[start:start + len(document)]) if keep))
+        start += len(document)
+    result = CompactionResult(
+        texts=compacted,
+        tokens_before=tokens_before,
+        tokens_after=sum(count_tokens(text, model) for text in compacted),
+    )
+    logger.info(
+        "Compacted transcripts from %d to %d tokens (%.1f%% kept, budget %d)",
+        result.tokens_before,
+        result.tokens_after,
+        result.ratio * 100,
+        budget,
+    )
+    return result
+
+
+def chunk_transcripts(texts: List[str], chunk_tokens: int, model: Optional[str] = None) -> List[str]:
+    """Split transcripts into sentence-aligned chunks of at most ``chunk_tokens``.
+
+    Chunks never span two transcripts, so each chunk's content (and therefore
+    its cache key) only depends on the source it came from.
+    """
+    chunks: List[str] = []
+    for text in texts:
+        current: List[str] = []
+        used = 0
+        for sentence in split_sentences(text):
+            cost = count_tokens(sentence, model) + 1
+            if current and used + cost > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, used = [], 0
+            current.append(sentence)
+            used += cost
+        if current:
+            chunks.append(" ".join(current))
+    return chunks
+
+
+def chunk_script(text: str, max_chars: int = 4000, boundary_every: int = 3) -> List[str]:
+    """Group a narration script into sentence-aligned chunks for speech synthesis.
+
+    Chunk boundaries are chosen from each sentence's own content (a hash test
+    that fires on average every ``boundary_every`` sentences), so editing one
+    sentence only changes the chunk containing it and cached audio for the
+    other chunks stays valid. Chunks never exceed ``max_chars`` unless a single
+    sentence does.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for sentence in split_sentences(text):
+        if current and length + 1 + len(sentence) > max_chars:
+            chunks.append(" ".join(current))
+            current, length = [], 0
+        current.append(sentence)
+        length += len(sentence) + (1 if length else 0)
+        if zlib.crc32(sentence.encode("utf-8")) % boundary_every == 0:
+            chunks.append(" ".join(current))
+            current, length = [], 0
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
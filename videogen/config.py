@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Optional, Tuple
 import os
 
 
@@ -18,36 +19,126 @@ class VideoGenConfig:
     openai_model: str = "gpt-4o-mini"
     openai_tts_model: str = "gpt-4o-mini-tts"
     openai_tts_voice: str = "alloy"
+    transcript_workers: int = 4
+    use_cache: bool = True
+    transcript_cache_ttl: float = 30 * 24 * 3600
+    transcript_cache_max_bytes: int = 256 * 1024 * 1024
+    normalize_captions: bool = True
+    outline_token_budget: int = 60000
+    outline_mode: str = "single"
+    map_chunk_tokens: int = 8000
+    map_workers: int = 4
+    summary_cache_max_bytes: int = 256 * 1024 * 1024
+    stream_outline: bool = False
+    structured_outline: bool = True
+    rate_limits: str = ""
+    tts_workers: int = 4
+    tts_cache_max_bytes: int = 2 * 1024 * 1024 * 1024
+    tts_split_sentences: bool = False
+    tts_chunk_workers: int = 4
+    tts_format: str = "mp3"
+    render_width: int = 1920
+    render_height: int = 1080
+    render_fps: int = 30
+    pexels_search_workers: int = 2
+    pexels_download_workers: int = 4
+    pexels_chunk_bytes: int = 1024 * 1024
+    media_library_max_bytes: int = 20 * 1024 * 1024 * 1024
+    pexels_search_cache_ttl: float = 7 * 24 * 3600
+    # Service endpoints, overridden to point the pipeline at local stand-ins.
+    openai_base_url: Optional[str] = None
+    pexels_base_url: Optional[str] = None
+    transcript_base_url: Optional[str] = None
+    youtube_api_endpoint: Optional[str] = None
+    trace_path: Optional[Path] = None
+    otlp_endpoint: Optional[str] = None
+    metrics_textfile: Optional[Path] = None
+    prices: str = ""
 
     @classmethod
-    def from_environment(cls) -> "VideoGenConfig":
-        """Build configuration from environment variables."""
+    def from_environment(cls, services: Iterable[str] = ("openai", "pexels", "youtube")) -> "VideoGenConfig":
+        """Build configuration from environment variables.
+
+        Credentials are checked only for ``services``, so tools that talk to a
+        single API need not configure the others.
+        """
+        services = set(services)
         openai_key = os.environ.get("OPENAI_API_KEY")
         pexels_key = os.environ.get("PEXELS_API_KEY")
         client_secret = os.environ.get("YOUTUBE_CLIENT_SECRET")
         output_dir = Path(os.environ.get("VIDEOGEN_OUTPUT_DIR", "output"))
         working_dir = Path(os.environ.get("VIDEOGEN_WORKING_DIR", "working"))
-        if not openai_key:
+        openai_base_url = os.environ.get("VIDEOGEN_OPENAI_BASE_URL") or None
+        pexels_base_url = os.environ.get("VIDEOGEN_PEXELS_BASE_URL") or None
+        youtube_api_endpoint = os.environ.get("VIDEOGEN_YOUTUBE_API_ENDPOINT") or None
+        render_width, render_height = parse_resolution(os.environ.get("VIDEOGEN_RENDER_RESOLUTION", "1920x1080"))
+        # Credentials are only required for the services that are not redirected.
+        if "openai" in services and not openai_key and not openai_base_url:
             raise EnvironmentError("OPENAI_API_KEY must be set")
-        if not pexels_key:
+        if "pexels" in services and not pexels_key and not pexels_base_url:
             raise EnvironmentError("PEXELS_API_KEY must be set")
-        if not client_secret:
+        if "youtube" in services and not client_secret and not youtube_api_endpoint:
             raise EnvironmentError("YOUTUBE_CLIENT_SECRET must be set")
 
         output_dir.mkdir(parents=True, exist_ok=True)
         working_dir.mkdir(parents=True, exist_ok=True)
 
         return cls(
-            openai_api_key=openai_key,
-            pexels_api_key=pexels_key,
-            youtube_client_secret=Path(client_secret),
+            openai_api_key=openai_key or "offline",
+            pexels_api_key=pexels_key or "offline",
+            youtube_client_secret=Path(client_secret or "client_secret.json"),
             output_dir=output_dir,
             working_dir=working_dir,
             openai_model=os.environ.get("VIDEOGEN_OPENAI_MODEL", "gpt-4o-mini"),
             openai_tts_model=os.environ.get("VIDEOGEN_OPENAI_TTS_MODEL", "gpt-4o-mini-tts"),
             openai_tts_voice=os.environ.get("VIDEOGEN_OPENAI_TTS_VOICE", "alloy"),
+            transcript_workers=int(os.environ.get("VIDEOGEN_TRANSCRIPT_WORKERS", "4")),
+            use_cache=os.environ.get("VIDEOGEN_NO_CACHE", "") == "",
+            transcript_cache_ttl=float(os.environ.get("VIDEOGEN_TRANSCRIPT_CACHE_TTL", 30 * 24 * 3600)),
+            transcript_cache_max_bytes=int(os.environ.get("VIDEOGEN_TRANSCRIPT_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+            normalize_captions=os.environ.get("VIDEOGEN_RAW_CAPTIONS", "") == "",
+            outline_token_budget=int(os.environ.get("VIDEOGEN_OUTLINE_TOKEN_BUDGET", "60000")),
+            outline_mode=os.environ.get("VIDEOGEN_OUTLINE_MODE", "single"),
+            map_chunk_tokens=int(os.environ.get("VIDEOGEN_MAP_CHUNK_TOKENS", "8000")),
+            map_workers=int(os.environ.get("VIDEOGEN_MAP_WORKERS", "4")),
+            summary_cache_max_bytes=int(os.environ.get("VIDEOGEN_SUMMARY_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+            stream_outline=os.environ.get("VIDEOGEN_STREAM_OUTLINE", "") != "",
+            structured_outline=os.environ.get("VIDEOGEN_NO_JSON_SCHEMA", "") == "",
+            rate_limits=os.environ.get("VIDEOGEN_RATE_LIMITS", ""),
+            tts_workers=int(os.environ.get("VIDEOGEN_TTS_WORKERS", "4")),
+            tts_cache_max_bytes=int(os.environ.get("VIDEOGEN_TTS_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024)),
+            tts_split_sentences=os.environ.get("VIDEOGEN_TTS_SPLIT", "") != "",
+            tts_chunk_workers=int(os.environ.get("VIDEOGEN_TTS_CHUNK_WORKERS", "4")),
+            tts_format=os.environ.get("VIDEOGEN_OPENAI_TTS_FORMAT", "mp3"),
+            render_width=render_width,
+            render_height=render_height,
+            render_fps=int(os.environ.get("VIDEOGEN_RENDER_FPS", "30")),
+            pexels_search_workers=int(os.environ.get("VIDEOGEN_PEXELS_SEARCH_WORKERS", "2")),
+            pexels_download_workers=int(os.environ.get("VIDEOGEN_PEXELS_DOWNLOAD_WORKERS", "4")),
+            pexels_chunk_bytes=int(os.environ.get("VIDEOGEN_PEXELS_CHUNK_BYTES", 1024 * 1024)),
+            media_library_max_bytes=int(os.environ.get("VIDEOGEN_MEDIA_LIBRARY_MAX_BYTES", 20 * 1024 * 1024 * 1024)),
+            pexels_search_cache_ttl=float(os.environ.get("VIDEOGEN_PEXELS_SEARCH_CACHE_TTL", 7 * 24 * 3600)),
+            openai_base_url=openai_base_url,
+            pexels_base_url=pexels_base_url,
+            transcript_base_url=os.environ.get("VIDEOGEN_TRANSCRIPT_BASE_URL") or None,
+            youtube_api_endpoint=youtube_api_endpoint,
+            trace_path=Path(os.environ["VIDEOGEN_TRACE"]) if os.environ.get("VIDEOGEN_TRACE") else None,
+            otlp_endpoint=os.environ.get("VIDEOGEN_OTLP_ENDPOINT") or None,
+            metrics_textfile=Path(os.environ["VIDEOGEN_METRICS_TEXTFILE"]) if os.environ.get("VIDEOGEN_METRICS_TEXTFILE") else None,
+            prices=os.environ.get("VIDEOGEN_PRICES", ""),
         )
 
+    @property
+    def cache_dir(self) -> Path:
+        """Root directory for persistent caches shared between runs."""
+        return self.working_dir / "cache"
+
+
+def parse_resolution(spec: str) -> Tuple[int, int]:
+    """Parse ``"1920x1080"`` into a width and height."""
+    width, _, height = spec.lower().partition("x")
+    return int(width), int(height)
+
 
 def ensure_directory(path: Path) -> Path:
     """Ensure that the directory for the given path exists."""
@@ -0,0 +1,255 @@
+"""Dry-run estimates of a job's API cost and wall clock before anything paid is called."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import math
+import statistics
+
+from .compaction import chunk_transcripts, compact_transcripts
+from .config import VideoGenConfig
+from .openai_utils import OUTLINE_SYSTEM_PROMPT, SUMMARY_SYSTEM_PROMPT
+from .tokens import count_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+# USD per million tokens (input, output); TTS models are priced per million input characters.
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini-tts": (15.00, 0.0),
+    "tts-1": (15.00, 0.0),
+    "tts-1-hd": (30.00, 0.0),
+}
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``"gpt-4o-mini=0.15:0.6,tts-1=15"`` into per-model prices."""
+    prices: Dict[str, Tuple[float, float]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        given, _, taken = values.partition(":")
+        prices[name.strip()] = (float(given), float(taken or 0.0))
+    return prices
+
+
+@dataclass
+class History:
+    """Per-unit rates learned from earlier projects, with defaults for a cold start."""
+
+    projects: int = 0
+    segments: float = 6.0
+    script_chars: float = 900.0  # per segment
+    narration_seconds_per_char: float = 1 / 15
+    outline_output_tokens_per_char: float = 0.4
+    summary_output_ratio: float = 0.12  # summary tokens per chunk token in map-reduce (responses.summary)
+    missing_video_ratio: float = 0.1
+    download_bytes: float = 20e6
+    response_seconds_per_output_token: float = 0.02
+    response_overhead_seconds: float = 1.0
+    speech_seconds: float = 6.0
+    search_seconds: float = 0.5
+    download_seconds: float = 3.0
+    render_seconds_per_second: float = 1.5
+    upload_bytes_per_second: float = 5e6
+
+
+def _per_call(metrics: Dict[str, Any], provider: str, operation: str, key: str) -> Optional[float]:
+    stats = metrics.get("providers", {}).get(provider, {}).get(operation)
+    if not stats or not stats.get("calls"):
+        return None
+    return stats.get(key, 0) / stats["calls"]
+
+
+def load_history(output_dir: Path) -> History:
+    """Median rates over the project files in ``output_dir`` that carry metrics."""
+    samples: Dict[str, List[float]] = {}
+
+    def add(name: str, value: Optional[float]) -> None:
+        if value is not None and value > 0:
+            samples.setdefault(name, []).append(value)
+
+    projects = 0
+    for path in sorted(output_dir.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        metrics = data.get("metrics") if isinstance(data, dict) else None
+        segments = data.get("segments") if isinstance(data, dict) else None
+        if not metrics or not segments:
+            continue
+        projects += 1
+        chars = sum(len(segment.get("script", "")) for segment in segments)
+        narration = sum(segment.get("duration", 0.0) for segment in segments)
+        add("segments", len(segments))
+        add("script_chars", chars / len(segments))
+        add("narration_seconds_per_char", narration / chars if chars else None)
+        samples.setdefault("missing_video_ratio", []).append(sum(1 for segment in segments if not segment.get("video_path")) / len(segments))
+        providers = metrics.get("providers", {})
+        openai = providers.get("openai", {})
+        outline_output = sum(
+            stats.get("output_tokens", 0) for operation, stats in openai.items()
+            if operation.startswith("responses") and operation != "responses.summary"
+        )
+        add("outline_output_tokens_per_char", outline_output / chars if chars else None)
+        summaries = openai.get("responses.summary", {})
+        if summaries.get("input_tokens"):
+            add("summary_output_ratio", summaries.get("output_tokens", 0) / summaries["input_tokens"])
+        add("download_bytes", _per_call(metrics, "pexels", "download", "bytes_in"))
+        add("speech_seconds", _per_call(metrics, "openai", "speech", "latency_seconds"))
+        add("search_seconds", _per_call(metrics, "pexels", "search", "latency_seconds"))
+        add("download_seconds", _per_call(metrics, "pexels", "download", "latency_seconds"))
+        responses = openai.get("responses", {})
+        if responses.get("output_tokens"):
+            add("response_seconds_per_output_token", responses["latency_seconds"] / responses["output_tokens"])
+        render = providers.get("local", {}).get("render", {})
+        add("render_seconds_per_second", render.get("latency_seconds", 0) / narration if narration else None)
+        upload = providers.get("youtube", {}).get("upload", {})
+        if upload.get("latency_seconds"):
+            add("upload_bytes_per_second", upload.get("bytes_out", 0) / upload["latency_seconds"])
+
+    history = History(projects=projects)
+    for name, values in samples.items():
+        setattr(history, name, statistics.median(values))
+    return history
+
+
+@dataclass
+class JobEstimate:
+    """Expected volume, cost and duration of one job."""
+
+    sources: int
+    source_tokens: int
+    outline_input_tokens: int
+    outline_output_tokens: int
+    segments: int
+    tts_characters: int
+    narration_seconds: float
+    stock_downloads: int
+    stock_bytes: float
+    cost_usd: Dict[str, float] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    history_projects: int = 0
+
+    @property
+    def total_cost(self) -> float:
+        return sum(self.cost_usd.values())
+
+    @property
+    def wall_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "total_cost_usd": round(self.total_cost, 4), "wall_seconds": round(self.wall_seconds, 1)}
+
+    def report(self) -> str:
+        lines = [
+            f"Sources: {self.sources} transcripts, {self.source_tokens:,} tokens",
+            f"Outline: ~{self.outline_input_tokens:,} input / ~{self.outline_output_tokens:,} output tokens",
+            f"Segments: ~{self.segments}, {self.tts_characters:,} TTS characters, ~{self.narration_seconds / 60:.1f} min narration",
+            f"Stock footage: ~{self.stock_downloads} downloads, ~{self.stock_bytes / 1e6:.0f} MB",
+            "Cost (USD): " + ", ".join(f"{name} ${value:.4f}" for name, value in self.cost_usd.items()) + f" = ${self.total_cost:.4f}",
+            "Time: " + ", ".join(f"{name} {value:.0f}s" for name, value in self.seconds.items()) + f" = ~{self.wall_seconds / 60:.1f} min",
+            f"Based on {self.history_projects} earlier project(s)" if self.history_projects else "No earlier projects with metrics; using defaults",
+        ]
+        return "\n".join(lines)
+
+
+def _price(prices: Dict[str, Tuple[float, float]], model: str) -> Tuple[float, float]:
+    if model in prices:
+        return prices[model]
+    # Dated snapshots such as "gpt-4o-mini-2024-07-18" use their family's price.
+    family = max((name for name in prices if model.startswith(name)), key=len, default=None)
+    if family is None:
+        logger.warning("No price known for %s; counting it as free", model)
+        return 0.0, 0.0
+    return prices[family]
+
+
+def estimate_job(
+    texts: Iterable[str],
+    prompt: str,
+    config: VideoGenConfig,
+    history: Optional[History] = None,
+    render: bool = False,
+    upload: bool = False,
+    prices: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> JobEstimate:
+    """Estimate volume, cost and wall clock for outlining, narrating and rendering ``texts``.
+
+    Token counts of the sources are exact; everything downstream of the outline
+    is scaled from ``history``.
+    """
+    texts = list(texts)
+    history = history or History()
+    prices = {**DEFAULT_PRICES, **(prices or {})}
+    model = config.openai_model
+    system_tokens = count_tokens(OUTLINE_SYSTEM_PROMPT, model) + count_tokens(prompt, model)
+    source_tokens = sum(count_tokens(text, model) for text in texts)
+
+    segments = max(1, round(history.segments))
+    tts_characters = int(segments * history.script_chars)
+    output_tokens = int(tts_characters * history.outline_output_tokens_per_char)
+    if config.outline_mode == "map-reduce":
+        chunks = chunk_transcripts(texts, config.map_chunk_tokens, model=model)
+        chunk_tokens = [count_tokens(chunk, model) for chunk in chunks]
+        summary_tokens = int(sum(chunk_tokens) * history.summary_output_ratio)
+        summary_system = count_tokens(SUMMARY_SYSTEM_PROMPT, model)
+        input_tokens = sum(chunk_tokens) + summary_system * len(chunks) + summary_tokens + system_tokens
+        map_output = summary_tokens
+        map_seconds = math.ceil(len(chunks) / max(1, config.map_workers)) * (
+            history.response_overhead_seconds + history.response_seconds_per_output_token * summary_tokens / max(1, len(chunks))
+        )
+    else:
+        compaction = compact_transcripts(texts, config.outline_token_budget, model=model)
+        input_tokens = compaction.tokens_after + system_tokens
+        map_output = 0
+        map_seconds = 0.0
+
+    text_in, text_out = _price(prices, model)
+    tts_price, _ = _price(prices, config.openai_tts_model)
+    stock_downloads = round(segments * (1 - history.missing_video_ratio))
+    narration_seconds = tts_characters * history.narration_seconds_per_char
+
+    outline_seconds = map_seconds + history.response_overhead_seconds + output_tokens * history.response_seconds_per_output_token
+    tts_seconds = math.ceil(segments / max(1, config.tts_workers)) * history.speech_seconds
+    # Stock footage is fetched alongside narration, searches and downloads on separate limits.
+    stock_seconds = (
+        math.ceil(segments / max(1, config.pexels_search_workers)) * history.search_seconds
+        + math.ceil(stock_downloads / max(1, config.pexels_download_workers)) * history.download_seconds
+    )
+    seconds = {
+        "outline": outline_seconds,
+        "narration+stock": max(tts_seconds, stock_seconds),
+    }
+    if render:
+        seconds["render"] = narration_seconds * history.render_seconds_per_second
+    if upload:
+        # Roughly the size of the stock footage that ends up in the render.
+        seconds["upload"] = stock_downloads * history.download_bytes / history.upload_bytes_per_second
+
+    return JobEstimate(
+        sources=len(texts),
+        source_tokens=source_tokens,
+        outline_input_tokens=input_tokens,
+        outline_output_tokens=output_tokens + map_output,
+        segments=segments,
+        tts_characters=tts_characters,
+        narration_seconds=narration_seconds,
+        stock_downloads=stock_downloads,
+        stock_bytes=stock_downloads * history.download_bytes,
+        cost_usd={
+            "outline": (input_tokens * text_in + (output_tokens + map_output) * text_out) / 1e6,
+            "tts": tts_characters * tts_price / 1e6,
+        },
+        seconds=seconds,
+        history_projects=history.projects,
+    )
@@ -0,0 +1,75 @@
+"""Incremental parsing of the outline JSON while it is still being generated."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+import json
+
+
+class SegmentStreamParser:
+    """Emit each object of the top-level ``segments`` array as soon as it closes.
+
+    Text is fed in arbitrary chunks (for example streamed output deltas).
+    Anything outside the JSON document, such as a Markdown code fence, is
+    ignored. A bare top-level array is treated as the segments array.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.segments: List[Dict[str, Any]] = []
+        self.consumed = 0
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume ``chunk`` and return the segment objects it completed."""
+        self.text += chunk
+        completed: List[Dict[str, Any]] = []
+        text = self.text
+        for position in range(self._position, len(text)):
+            char = text[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._item_start is None:
+                        self._last_string = text[self._string_start:position + 1]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char == ":" and len(self._stack) == 1 and self._last_string is not None:
+                self._key = json.loads(self._last_string)
+            elif char in "{[":
+                if char == "[" and self._array_depth is None and (not self._stack or (len(self._stack) == 1 and self._key == "segments")):
+                    self._array_depth = len(self._stack) + 1
+                elif char == "{" and self._array_depth is not None and len(self._stack) == self._array_depth:
+                    self._item_start = position
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._item_start is not None and char == "}" and len(self._stack) == self._array_depth:
+                    item = json.loads(text[self._item_start:position + 1])
+                    self._item_start = None
+                    self.consumed = position + 1
+                    self.segments.append(item)
+                    completed.append(item)
+                elif self._array_depth is not None and len(self._stack) < self._array_depth:
+                    self._array_depth = None
+        self._position = len(text)
+        return completed
+
+    @property
+    def complete(self) -> bool:
+        """True once the outermost JSON value has been closed."""
+        return self._position > 0 and not self._stack and bool(self.segments)
@@ -0,0 +1,168 @@
+"""Persistent library of downloaded stock clips, indexed by Pexels video and rendition."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+import sqlite3
+import threading
+import time
+
+from .cache import link_or_copy
+from .config import ensure_directory
+
+
+logger = logging.getLogger(__name__)
+
+
+def rendition_key(item: Dict[str, Any]) -> str:
+    """Identify a rendition by its Pexels file id, or by its shape when the id is missing."""
+    if item.get("id") is not None:
+        return str(item["id"])
+    return f"{item.get('width') or 0}x{item.get('height') or 0}@{item.get('fps') or 0:g}"
+
+
+@dataclass
+class MediaEntry:
+    """One stored rendition and what is known about it."""
+
+    video_id: str
+    rendition: str
+    path: Path
+    size: int
+    duration: float
+    width: int
+    height: int
+    fps: float
+    created: float
+    last_used: float
+    queries: List[str] = field(default_factory=list)
+
+
+class MediaLibrary:
+    """Clips under ``directory`` indexed by a SQLite database, trimmed LRU-first to ``max_bytes``.
+
+    Like :class:`~videogen.cache.DiskCache`, the index is opened per operation
+    and files are written under a temporary name and renamed into place, so
+    the library can be shared by threads and processes on the same host.
+    Callers get hard links to stored clips, which survive a later eviction.
+    """
+
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None) -> None:
+        self.directory = ensure_directory(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = self.directory / "index.sqlite3"
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                "video_id TEXT NOT NULL, rendition TEXT NOT NULL, path TEXT NOT NULL, "
+                "size INTEGER NOT NULL, duration REAL NOT NULL, width INTEGER NOT NULL, "
+                "height INTEGER NOT NULL, fps REAL NOT NULL, created REAL NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (video_id, rendition))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "video_id TEXT NOT NULL, rendition TEXT NOT NULL, query TEXT NOT NULL, "
+                "PRIMARY KEY (video_id, rendition, query))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS media_last_used ON media (last_used)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self._index_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def path_for(self, video_id: Any, rendition: str) -> Path:
+        """Where a rendition is stored; download straight to it, then :meth:`add` it."""
+        return self.directory / str(video_id) / f"{rendition}.mp4"
+
+    def _lookup(self, video_id: str, rendition: str, query: Optional[str]) -> Optional[MediaEntry]:
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT path, size, duration, width, height, fps, created FROM media WHERE video_id = ? AND rendition = ?",
+                (video_id, rendition),
+            ).fetchone()
+            if row is None or not (self.directory / row[0]).exists():
+                return None
+            connection.execute("UPDATE media SET last_used = ? WHERE video_id = ? AND rendition = ?", (now, video_id, rendition))
+            if query:
+                connection.execute("INSERT OR IGNORE INTO queries (video_id, rendition, query) VALUES (?, ?, ?)", (video_id, rendition, query))
+            queries = [item[0] for item in connection.execute("SELECT query FROM queries WHERE video_id = ? AND rendition = ?", (video_id, rendition))]
+        path, size, duration, width, height, fps, created = row
+        return MediaEntry(video_id, rendition, self.directory / path, size, duration, width, height, fps, created, now, queries)
+
+    def get(self, video_id: Any, rendition: str, query: Optional[str] = None) -> Optional[MediaEntry]:
+        """Return a stored rendition, marking it as recently used and noting ``query``."""
+        entry = self._lookup(str(video_id), rendition, query)
+        self._count(entry is not None)
+        return entry
+
+    def checkout(self, video_id: Any, rendition: str, destination: Path, query: Optional[str] = None) -> Optional[MediaEntry]:
+        """Link a stored rendition to ``destination``; ``None`` if it is not (or no longer) stored."""
+        entry = self._lookup(str(video_id), rendition, query)
+        if entry is not None:
+            try:
+                link_or_copy(entry.path, destination)
+            except FileNotFoundError:  # evicted by another process in between
+                entry = None
+        self._count(entry is not None)
+        return entry
+
+    def add(self, video_id: Any, rendition: str, duration: float = 0.0, width: int = 0, height: int = 0, fps: float = 0.0, query: Optional[str] = None) -> Path:
+        """Index the file already written to :meth:`path_for` and trim the library."""
+        video_id = str(video_id)
+        path = self.path_for(video_id, rendition)
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO media (video_id, rendition, path, size, duration, width, height, fps, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, rendition, path.relative_to(self.directory).as_posix(), path.stat().st_size, duration, width, height, fps, now, now),
+            )
+            if query:
+                connection.execute("INSERT OR IGNORE INTO queries (video_id, rendition, query) VALUES (?, ?, ?)", (video_id, rendition, query))
+        self.evict()
+        return path
+
+    def total_bytes(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COALESCE(SUM(size), 0) FROM media").fetchone()[0]
+
+    def evict(self) -> int:
+        """Remove least recently used clips until the library fits in ``max_bytes``."""
+        if self.max_bytes is None:
+            return 0
+        removed = []
+        with self._connect() as connection:
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM media").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            for video_id, rendition, path, size in connection.execute("SELECT video_id, rendition, path, size FROM media ORDER BY last_used ASC"):
+                if total <= self.max_bytes:
+                    break
+                removed.append((video_id, rendition, path))
+                total -= size
+            connection.executemany("DELETE FROM media WHERE video_id = ? AND rendition = ?", [item[:2] for item in removed])
+            connection.executemany("DELETE FROM queries WHERE video_id = ? AND rendition = ?", [item[:2] for item in removed])
+        for _, _, path in removed:
+            (self.directory / path).unlink(missing_ok=True)
+        if removed:
+            logger.info("Evicted %d clips from media library %s", len(removed), self.directory)
+        return len(removed)
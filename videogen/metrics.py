@@ -0,0 +1,174 @@
+"""Per-run accounting of tokens, characters, bytes and latency for external calls."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+import bisect
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds of the Prometheus latency histogram, in seconds.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Amounts a call can report, with their Prometheus metric names.
+AMOUNTS = {
+    "input_tokens": "videogen_input_tokens_total",
+    "output_tokens": "videogen_output_tokens_total",
+    "characters": "videogen_characters_total",
+    "bytes_in": "videogen_bytes_received_total",
+    "bytes_out": "videogen_bytes_sent_total",
+}
+
+
+@dataclass
+class CallStats:
+    """Aggregates for one provider and operation."""
+
+    calls: int = 0
+    errors: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    buckets: list = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    amounts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, latency: float, error: bool, amounts: Mapping[str, int]) -> None:
+        self.calls += 1
+        self.errors += int(error)
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        index = bisect.bisect_left(LATENCY_BUCKETS, latency)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        for name, value in amounts.items():
+            if value:
+                self.amounts[name] = self.amounts.get(name, 0) + int(value)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_seconds": round(self.latency_total, 3),
+            "latency_mean_seconds": round(self.latency_total / self.calls, 3) if self.calls else 0.0,
+            "latency_max_seconds": round(self.latency_max, 3),
+            **self.amounts,
+        }
+
+
+class MetricsCollector:
+    """Thread-safe store the OpenAI, Pexels and YouTube modules report into."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], CallStats] = {}
+        self.started = time.time()
+
+    def record(self, provider: str, operation: str, latency: float, error: bool = False, **amounts: int) -> None:
+        with self._lock:
+            self._stats.setdefault((provider, operation), CallStats()).add(latency, error, amounts)
+
+    @contextmanager
+    def measure(self, provider: str, operation: str, **amounts: int) -> Iterator[Dict[str, int]]:
+        """Time the block; amounts known only afterwards are set on the yielded dict."""
+        reported: Dict[str, int] = dict(amounts)
+        started = time.perf_counter()
+        error = False
+        try:
+            yield reported
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(provider, operation, time.perf_counter() - started, error, **reported)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per provider and operation aggregates plus run totals, JSON serializable."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        providers: Dict[str, Dict[str, Any]] = {}
+        totals: Dict[str, Any] = {"calls": 0, "errors": 0}
+        for (provider, operation), stats in items:
+            providers.setdefault(provider, {})[operation] = stats.summary()
+            totals["calls"] += stats.calls
+            totals["errors"] += stats.errors
+            for name, value in stats.amounts.items():
+                totals[name] = totals.get(name, 0) + value
+        return {"wall_seconds": round(time.time() - self.started, 3), "totals": totals, "providers": providers}
+
+    def prometheus(self, labels: Optional[Mapping[str, str]] = None) -> str:
+        """Render the aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        base = dict(labels or {})
+        lines = []
+
+        def sample(name: str, value: float, **extra: str) -> None:
+            merged = {**base, **extra}
+            rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in merged.items())
+            text = str(int(value)) if float(value).is_integer() else repr(float(value))
+            lines.append(f"{name}{{{rendered}}} {text}")
+
+        lines += ["# HELP videogen_api_calls_total External API calls.", "# TYPE videogen_api_calls_total counter"]
+        for (provider, operation), stats in items:
+            sample("videogen_api_calls_total", stats.calls, provider=provider, operation=operation)
+        lines += ["# HELP videogen_api_errors_total External API calls that failed after retries.", "# TYPE videogen_api_errors_total counter"]
+        for (provider, operation), stats in items:
+            sample("videogen_api_errors_total", stats.errors, provider=provider, operation=operation)
+        lines += ["# HELP videogen_api_latency_seconds Latency of external API calls, retries included.", "# TYPE videogen_api_latency_seconds histogram"]
+        for (provider, operation), stats in items:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                sample("videogen_api_latency_seconds_bucket", cumulative, provider=provider, operation=operation, le=f"{bound:g}")
+            sample("videogen_api_latency_seconds_bucket", stats.calls, provider=provider, operation=operation, le="+Inf")
+            sample("videogen_api_latency_seconds_sum", stats.latency_total, provider=provider, operation=operation)
+            sample("videogen_api_latency_seconds_count", stats.calls, provider=provider, operation=operation)
+        for amount, name in AMOUNTS.items():
+            lines += [f"# TYPE {name} counter"]
+            for (provider, operation), stats in items:
+                if amount in stats.amounts:
+                    sample(name, stats.amounts[amount], provider=provider, operation=operation)
+        lines += ["# TYPE videogen_run_timestamp_seconds gauge"]
+        sample("videogen_run_timestamp_seconds", time.time())
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path, labels: Optional[Mapping[str, str]] = None) -> Path:
+        """Write a node-exporter textfile atomically, so a scrape never sees half a file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temporary.write_text(self.prometheus(labels), encoding="utf-8")
+        os.replace(temporary, path)
+        logger.info("Wrote metrics to %s", path)
+        return path
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def usage_amounts(usage: Any) -> Dict[str, int]:
+    """Token counts from an OpenAI ``response.usage`` object, if present."""
+    if usage is None:
+        return {}
+    return {"input_tokens": getattr(usage, "input_tokens", 0) or 0, "output_tokens": getattr(usage, "output_tokens", 0) or 0}
+
+
+_metrics = MetricsCollector()
+
+
+def get_metrics() -> MetricsCollector:
+    return _metrics
+
+
+def configure_metrics() -> MetricsCollector:
+    """Start a fresh process-wide collector, e.g. at the beginning of a run."""
+    global _metrics
+    _metrics = MetricsCollector()
+    return _metrics
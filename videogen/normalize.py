@@ -0,0 +1,114 @@
+"""Caption clean-up that removes noise before transcripts reach the LLM."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+import logging
+import re
+
+from .tokens import count_tokens
+from .transcript import TimedTranscript
+from .youtube import VideoTranscript
+
+
+logger = logging.getLogger(__name__)
+
+
+_BRACKET_TAG_RE = re.compile(r"\[[^\]]*\]|\([^)]*\b(?:music|applause|laughter|laughs|inaudible)\b[^)]*\)|[♪♫]+", re.IGNORECASE)
+_SPEAKER_MARK_RE = re.compile(r"^\s*>>\s*|\s+>>\s*")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+MAX_OVERLAP_WORDS = 40
+# A single shared word ("... we can" / "can you ...") is usually genuine text, not a rolling caption.
+MIN_OVERLAP_WORDS = 2
+
+
+@dataclass
+class NormalizationStats:
+    """Before/after sizes for a normalization pass."""
+
+    chars_before: int = 0
+    chars_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    entries_dropped: int = 0
+
+    @property
+    def chars_removed(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_removed(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def merge(self, other: "NormalizationStats") -> None:
+        self.chars_before += other.chars_before
+        self.chars_after += other.chars_after
+        self.tokens_before += other.tokens_before
+        self.tokens_after += other.tokens_after
+        self.entries_dropped += other.entries_dropped
+
+
+def clean_caption(text: str) -> str:
+    """Strip bracketed tags such as ``[Music]``, speaker marks and extra whitespace."""
+    text = _BRACKET_TAG_RE.sub(" ", text)
+    text = _SPEAKER_MARK_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _overlap(previous: List[str], current: List[str]) -> int:
+    """Length of the longest suffix of ``previous`` that prefixes ``current``.
+
+    Overlaps shorter than ``MIN_OVERLAP_WORDS`` count only when they repeat
+    the whole of ``current``.
+    """
+    limit = min(len(previous), len(current), MAX_OVERLAP_WORDS)
+    previous_folded = [word.casefold() for word in previous[-limit:]] if limit else []
+    current_folded = [word.casefold() for word in current[:limit]]
+    for size in range(limit, 0, -1):
+        if previous_folded[-size:] == current_folded[:size] and (size >= MIN_OVERLAP_WORDS or size == len(current)):
+            return size
+    return 0
+
+
+def normalize_timeline(timeline: TimedTranscript) -> Tuple[TimedTranscript, NormalizationStats]:
+    """Clean every caption and drop words that merely repeat the previous line."""
+    entries = []
+    tail: List[str] = []
+    dropped = 0
+    for text, start, duration in timeline.iter_entries():
+        words = clean_caption(text).split(" ") if text else []
+        words = [word for word in words if word]
+        words = words[_overlap(tail, words):]
+        if not words:
+            dropped += 1
+            continue
+        tail = (tail + words)[-MAX_OVERLAP_WORDS:]
+        entries.append({"text": " ".join(words), "start": start, "duration": duration})
+    normalized = TimedTranscript.from_entries(entries)
+    stats = NormalizationStats(
+        chars_before=len(timeline.text),
+        chars_after=len(normalized.text),
+        tokens_before=count_tokens(timeline.text),
+        tokens_after=count_tokens(normalized.text),
+        entries_dropped=dropped,
+    )
+    return normalized, stats
+
+
+def normalize_transcripts(transcripts: Iterable[VideoTranscript]) -> Tuple[List[VideoTranscript], NormalizationStats]:
+    """Pipeline stage run between transcript download and outline generation."""
+    total = NormalizationStats()
+    normalized: List[VideoTranscript] = []
+    for transcript in transcripts:
+        timeline = transcript.timeline or TimedTranscript.from_entries([{"text": transcript.text}])
+        cleaned, stats = normalize_timeline(timeline)
+        total.merge(stats)
+        normalized.append(VideoTranscript(video_id=transcript.video_id, title=transcript.title, text=cleaned.text, timeline=cleaned))
+    logger.info(
+        "Normalized captions: removed %d characters and ~%d tokens (%d duplicate entries)",
+        total.chars_removed,
+        total.tokens_removed,
+        total.entries_dropped,
+    )
+    return normalized, total
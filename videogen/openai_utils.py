@@ -1,18 +1,73 @@
 """Integration helpers for the OpenAI APIs."""
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import asyncio
 import json
 import logging
+import shutil
+import time
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from .audio import AUDIO_EXTENSIONS, JOINABLE_FORMATS, join_audio_files, pcm_to_wav
+from .cache import DiskCache, make_key
+from .compaction import chunk_script, chunk_transcripts
+from .jsonstream import SegmentStreamParser
+from .metrics import get_metrics, usage_amounts
+from .ratelimit import retry_call, retry_call_async
+from .tracing import get_tracer, span
 
 
 logger = logging.getLogger(__name__)
 
 
+OUTLINE_SYSTEM_PROMPT = (
+    "You are an assistant that creates structured video scripts. "
+    "Return valid JSON with a list of segments under a 'segments' key. "
+    "Each segment must include title, summary, script, and keywords array."
+)
+
+OUTLINE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "summary": {"type": "string"},
+                    "script": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "summary", "script", "keywords"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["segments"],
+    "additionalProperties": False,
+}
+
+OUTLINE_TEXT_FORMAT: Dict[str, Any] = {
+    "format": {"type": "json_schema", "name": "video_outline", "schema": OUTLINE_SCHEMA, "strict": True},
+}
+
+# Follow-up requests allowed when an outline is cut off before the JSON closes.
+MAX_OUTLINE_RESUMES = 3
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You condense transcript excerpts into dense notes for a script writer. "
+    "Keep every fact, figure, name, example and notable quote; drop filler, "
+    "repetition and small talk. Respond with plain-text bullet points only."
+)
+
+
 @dataclass
 class SegmentPlan:
     """Structured representation of a generated segment."""
@@ -32,54 +87,480 @@ class SegmentPlan:
         )
 
 
-class OpenAIWorkflow:
-    """Wrapper around the OpenAI API calls needed for the pipeline."""
+def salvage_segments(content: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return the segment objects in ``content`` and whether the JSON was complete.
+
+    A response cut off mid-document still yields every segment whose object
+    was fully closed before the cut. A bare array is taken as the segments.
+    Raises ``ValueError`` for text that is no outline at all, so it is not
+    answered with paid continuation requests.
+    """
+    try:
+        parsed = json.loads(content)
+    except json.JSONDecodeError:
+        parser = SegmentStreamParser()
+        parser.feed(content)
+        if not parser.segments and "{" not in content and "[" not in content:
+            raise ValueError(f"OpenAI returned no JSON outline: {content[:200]!r}")
+        return parser.segments, parser.complete
+    if isinstance(parsed, list):
+        return parsed, True
+    if not isinstance(parsed, dict):
+        raise ValueError(f"OpenAI returned JSON that is not an outline: {content[:200]!r}")
+    return list(parsed.get("segments", [])), True
+
+
+def check_segment_count(count: int) -> None:
+    if not count:
+        raise ValueError("OpenAI returned no segments")
+    logger.info("Generated %d segments", count)
+
+
+def plans_from_items(items: Sequence[Dict[str, Any]]) -> List[SegmentPlan]:
+    segments = [SegmentPlan.from_dict(item) for item in items]
+    check_segment_count(len(segments))
+    return segments
+
+
+def output_text(response: Any) -> str:
+    return response.output[0].content[0].text  # type: ignore[index]
+
+
+def continuation_prompt(user_prompt: str, received: Sequence[Dict[str, Any]]) -> str:
+    """Ask for the rest of an outline, listing what already arrived by title and summary."""
+    done = json.dumps([{"title": item.get("title", ""), "summary": item.get("summary", "")} for item in received], ensure_ascii=False)
+    return (
+        f"{user_prompt}\n\n"
+        "Your previous answer was cut off. These segments were already received and must not be repeated:\n"
+        f"{done}\n\n"
+        "Continue the same outline with the remaining segments only. Return JSON with just the new "
+        "segments under 'segments', or an empty list if the outline was already complete."
+    )
+
+
+class OutlineResume:
+    """Follow-up requests for an outline cut off before its JSON closed, without doing I/O.
+
+    Callers send each prompt from :meth:`next_prompt` until it returns ``None``
+    and hand every answer to :meth:`add`; ``items`` then holds the whole
+    outline and ``added`` what the follow-ups contributed.
+    """
+
+    def __init__(self, user_prompt: str, items: Sequence[Dict[str, Any]], complete: bool) -> None:
+        self.user_prompt = user_prompt
+        self.items = list(items)
+        self.added: List[Dict[str, Any]] = []
+        self.done = complete
+        self.requests = 0
+
+    @classmethod
+    def from_response(cls, user_prompt: str, content: str) -> "OutlineResume":
+        items, complete = salvage_segments(content)
+        if not complete:
+            logger.debug("Incomplete outline response: %s", content)
+        return cls(user_prompt, items, complete)
+
+    def next_prompt(self) -> Optional[str]:
+        if self.done:
+            return None
+        if self.requests >= MAX_OUTLINE_RESUMES:
+            logger.warning("Outline still incomplete after %d follow-ups; keeping %d segments", MAX_OUTLINE_RESUMES, len(self.items))
+            self.done = True
+            return None
+        self.requests += 1
+        logger.warning("Outline was cut off after %d segments; requesting the remainder", len(self.items))
+        return continuation_prompt(self.user_prompt, self.items)
+
+    def add(self, content: str) -> None:
+        items, complete = salvage_segments(content)
+        self.items += items
+        self.added += items
+        self.done = complete or not items
 
-    def __init__(self, api_key: str, model: str, tts_model: str, tts_voice: str) -> None:
-        self.client = OpenAI(api_key=api_key)
+
+def outline_prompt(transcripts: Iterable[str], prompt: str) -> str:
+    combined_text = "\n".join(transcripts)
+    return (
+        f"Original transcripts:\n{combined_text}\n\n"
+        f"Creative brief:\n{prompt}\n\n"
+        "Respond with JSON only."
+    )
+
+
+def reduce_prompt(summaries: Sequence[str], prompt: str) -> str:
+    notes = "\n\n".join(f"Part {index + 1}:\n{summary}" for index, summary in enumerate(summaries))
+    return (
+        f"Notes taken from the original transcripts, in order:\n{notes}\n\n"
+        f"Creative brief:\n{prompt}\n\n"
+        "Respond with JSON only."
+    )
+
+
+def summary_key(model: str, chunk: str) -> str:
+    return make_key("chunk-summary", model, SUMMARY_SYSTEM_PROMPT, chunk)
+
+
+def _parts_dir(destination: Path) -> Path:
+    return destination.parent / f".{destination.stem}-parts"
+
+
+def speech_key(model: str, voice: str, audio_format: str, text: str) -> str:
+    return make_key("tts", model, voice, audio_format, text)
+
+
+class _StreamMeter:
+    """Span and metrics for a streamed outline, kept apart from the code consuming it.
+
+    The span is not made current, so the caller's own spans are not nested
+    under it, and time spent suspended in ``yield`` is not counted as latency.
+    """
+
+    def __init__(self, **attributes: Any) -> None:
+        self.span = get_tracer().start("outline.stream", "openai", **attributes)
+        self.amounts: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._suspended = 0.0
+        self._finished = False
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        paused = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._suspended += time.perf_counter() - paused
+
+    def segments(self, event: Any, parser: SegmentStreamParser) -> List[Dict[str, Any]]:
+        """Segments closed by one streamed Responses event; the final usage is kept for :meth:`finish`."""
+        if event.type == "response.output_text.delta":
+            return parser.feed(event.delta)
+        if event.type == "response.completed":
+            self.amounts.update(usage_amounts(event.response.usage))
+        return []
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Close at the end of the response stream; a consumer stopping early is no error."""
+        if self._finished:
+            return
+        self._finished = True
+        if isinstance(error, GeneratorExit):
+            error = None
+        get_tracer().finish(self.span, error)
+        latency = time.perf_counter() - self._started - self._suspended
+        get_metrics().record("openai", "responses.stream", latency, error is not None, **self.amounts)
+
+
+class _WorkflowBase:
+    """Settings and I/O-free request building shared by the sync and async workflows.
+
+    Subclasses add a client and the transport calls, and nothing else.
+    """
+
+    def __init__(self, model: str, tts_model: str, tts_voice: str, tts_cache: Optional[DiskCache] = None, structured_output: bool = True, split_sentences: bool = False, chunk_workers: int = 4, tts_format: str = "mp3") -> None:
         self.model = model
+        self.structured_output = structured_output
         self.tts_model = tts_model
         self.tts_voice = tts_voice
+        self.tts_format = tts_format
+        self.tts_cache = tts_cache
+        self.split_sentences = split_sentences
+        self.chunk_workers = chunk_workers
 
-    def generate_script_outline(self, transcripts: Iterable[str], prompt: str) -> List[SegmentPlan]:
-        """Generate a structured plan for the new video using GPT."""
-        combined_text = "\n".join(transcripts)
-        system_prompt = (
-            "You are an assistant that creates structured video scripts. "
-            "Return valid JSON with a list of segments under a 'segments' key. "
-            "Each segment must include title, summary, script, and keywords array."
-        )
-        user_prompt = (
-            f"Original transcripts:\n{combined_text}\n\n"
-            f"Creative brief:\n{prompt}\n\n"
-            "Respond with JSON only."
-        )
-        response = self.client.responses.create(
+    def _response_request(self, system_prompt: str, user_prompt: str, temperature: float = 0.7, **options: Any) -> Dict[str, Any]:
+        return dict(
             model=self.model,
             input=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-            temperature=0.7,
+            temperature=temperature,
+            **options,
         )
-        content = response.output[0].content[0].text  # type: ignore[index]
+
+    def _outline_request(self, user_prompt: str, **options: Any) -> Dict[str, Any]:
+        if self.structured_output:
+            options["text"] = OUTLINE_TEXT_FORMAT
+        return self._response_request(OUTLINE_SYSTEM_PROMPT, user_prompt, **options)
+
+    def _summary_request(self, chunk: str) -> Dict[str, Any]:
+        return self._response_request(SUMMARY_SYSTEM_PROMPT, f"Transcript excerpt:\n{chunk}", temperature=0.2)
+
+    @contextmanager
+    def _metered_response(self, request: Dict[str, Any], operation: str) -> Iterator[Dict[str, Any]]:
+        """Span and metrics around one Responses call; put the usage into the yielded dict."""
+        prompt_chars = len(request["input"][-1]["content"])
+        with span("openai.response", "openai", model=self.model, prompt_chars=prompt_chars), get_metrics().measure("openai", operation) as metered:
+            yield metered
+
+    def _speech_request(self, text: str) -> Dict[str, Any]:
+        return dict(model=self.tts_model, voice=self.tts_voice, input=text, response_format=self.tts_format)
+
+    def _speech_key(self, text: str) -> str:
+        return speech_key(self.tts_model, self.tts_voice, self.tts_format, text)
+
+    def _speech_parts(self, text: str, destination: Path) -> List[Tuple[str, Path]]:
+        """``(text, path)`` per request; one item unless ``split_sentences`` splits the script."""
+        if not self.split_sentences or self.tts_format not in JOINABLE_FORMATS:
+            return [(text, destination)]
+        chunks = chunk_script(text)
+        if len(chunks) < 2:
+            return [(text, destination)]
+        parts_dir = _parts_dir(destination)
+        return [(chunk, parts_dir / f"{index:03d}.{AUDIO_EXTENSIONS[self.tts_format]}") for index, chunk in enumerate(chunks)]
+
+    def _join_speech(self, parts: Sequence[Tuple[str, Path]], destination: Path) -> Path:
+        join_audio_files([path for _, path in parts], destination, self.tts_format)
+        shutil.rmtree(_parts_dir(destination), ignore_errors=True)
+        logger.info("Joined %d speech chunks into %s", len(parts), destination)
+        return destination
+
+    def _finish_speech(self, destination: Path) -> None:
+        """Wrap raw PCM in a WAV header once the response is on disk."""
+        if self.tts_format == "pcm":
+            destination.write_bytes(pcm_to_wav(destination.read_bytes()))
+
+    @contextmanager
+    def _metered_speech(self, text: str, destination: Path) -> Iterator[None]:
+        started = time.perf_counter()
+        with span("tts", "openai", file=destination.name, chars=len(text), format=self.tts_format), get_metrics().measure("openai", "speech", characters=len(text)) as metered:
+            yield
+            metered["bytes_in"] = destination.stat().st_size
+        logger.info("Generated speech at %s in %.2fs", destination, time.perf_counter() - started)
+
+
+class OpenAIWorkflow(_WorkflowBase):
+    """Wrapper around the OpenAI API calls needed for the pipeline."""
+
+    def __init__(self, api_key: str, model: str, tts_model: str, tts_voice: str, tts_cache: Optional[DiskCache] = None, structured_output: bool = True, split_sentences: bool = False, chunk_workers: int = 4, tts_format: str = "mp3", base_url: Optional[str] = None) -> None:
+        super().__init__(model, tts_model, tts_voice, tts_cache, structured_output, split_sentences, chunk_workers, tts_format)
+        # Retries are handled by videogen.ratelimit so every worker shares one backoff.
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    def _complete(self, request: Dict[str, Any], operation: str = "responses") -> str:
+        with self._metered_response(request, operation) as metered:
+            response = retry_call("openai", lambda: self.client.responses.create(**request))
+            metered.update(usage_amounts(getattr(response, "usage", None)))
+        return output_text(response)
+
+    def _resume_outline(self, resume: OutlineResume) -> List[Dict[str, Any]]:
+        """Request only the segments missing after a truncated outline."""
+        while (follow_up := resume.next_prompt()) is not None:
+            resume.add(self._complete(self._outline_request(follow_up)))
+        return resume.added
+
+    def _outline_items(self, user_prompt: str) -> List[Dict[str, Any]]:
+        resume = OutlineResume.from_response(user_prompt, self._complete(self._outline_request(user_prompt)))
+        self._resume_outline(resume)
+        return resume.items
+
+    def generate_script_outline(self, transcripts: Iterable[str], prompt: str) -> List[SegmentPlan]:
+        """Generate a structured plan for the new video using GPT.
+
+        The response is constrained to the segments JSON schema. If it is cut
+        off anyway, the closed segments are kept and only the rest is requested.
+        """
+        with span("outline", "openai"):
+            return plans_from_items(self._outline_items(outline_prompt(transcripts, prompt)))
+
+    def stream_script_outline(self, transcripts: Iterable[str], prompt: str) -> Iterator[SegmentPlan]:
+        """Stream the outline and yield each segment as soon as its JSON object closes."""
+        user_prompt = outline_prompt(transcripts, prompt)
+        parser = SegmentStreamParser()
+        meter = _StreamMeter(model=self.model)
         try:
-            parsed = json.loads(content)
-        except json.JSONDecodeError as exc:
-            logger.exception("Failed to parse response: %s", content)
-            raise ValueError("OpenAI response was not valid JSON") from exc
-        segments = [SegmentPlan.from_dict(item) for item in parsed.get("segments", [])]
-        if not segments:
-            raise ValueError("OpenAI returned no segments")
-        logger.info("Generated %d segments", len(segments))
-        return segments
+            stream = retry_call("openai", lambda: self.client.responses.create(**self._outline_request(user_prompt, stream=True)))
+            for event in stream:
+                for item in meter.segments(event, parser):
+                    with meter.suspended():
+                        yield SegmentPlan.from_dict(item)
+        except BaseException as exc:
+            meter.finish(exc)
+            raise
+        meter.finish()
+        resume = OutlineResume(user_prompt, parser.segments, parser.complete)
+        for item in self._resume_outline(resume):
+            yield SegmentPlan.from_dict(item)
+        check_segment_count(len(resume.items))
+
+    def summarize_chunk(self, chunk: str, cache: Optional[DiskCache] = None) -> str:
+        """Condense one transcript chunk, reusing a cached summary when available."""
+        key = summary_key(self.model, chunk)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached.decode("utf-8")
+        summary = self._complete(self._summary_request(chunk), operation="responses.summary")
+        if cache is not None:
+            cache.set(key, summary.encode("utf-8"))
+        return summary
+
+    def generate_script_outline_map_reduce(
+        self,
+        transcripts: Iterable[str],
+        prompt: str,
+        chunk_tokens: int = 8000,
+        max_workers: int = 4,
+        cache: Optional[DiskCache] = None,
+    ) -> List[SegmentPlan]:
+        """Summarize transcript chunks concurrently, then outline from the summaries.
+
+        The map step does not depend on the brief, so with a ``cache`` a new
+        brief over the same sources only pays for the final reduce call.
+        """
+        chunks = chunk_transcripts(list(transcripts), chunk_tokens, model=self.model)
+        with span("outline.map", "openai", chunks=len(chunks)), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            summaries = list(executor.map(lambda chunk: self.summarize_chunk(chunk, cache), chunks))
+        logger.info("Summarized %d transcript chunks", len(chunks))
+        with span("outline.reduce", "openai"):
+            return plans_from_items(self._outline_items(reduce_prompt(summaries, prompt)))
 
     def generate_speech(self, text: str, destination: Path) -> Path:
-        """Generate narration audio for the provided text."""
+        """Generate narration audio for the provided text.
+
+        With ``split_sentences`` a long script is synthesized as sentence-aligned
+        chunks in parallel and joined without re-encoding; each chunk is cached
+        on its own, so editing one sentence only re-synthesizes its chunk.
+        """
+        parts = self._speech_parts(text, destination)
+        if len(parts) < 2:
+            return self._synthesize(text, destination)
+        with ThreadPoolExecutor(max_workers=max(1, self.chunk_workers)) as executor:
+            list(executor.map(lambda part: self._synthesize(*part), parts))
+        return self._join_speech(parts, destination)
+
+    def _synthesize(self, text: str, destination: Path) -> Path:
+        """Synthesize one request, reading through ``tts_cache``.
+
+        Identical text, model, voice and format is served from disk. Requests go
+        through the shared rate limiter and are retried on rate-limit and
+        transient errors.
+        """
+        key = self._speech_key(text)
+        if self.tts_cache is not None and self.tts_cache.copy_to(key, destination):
+            logger.info("Reused cached speech for %s", destination)
+            return destination
         destination.parent.mkdir(parents=True, exist_ok=True)
-        with self.client.audio.speech.with_streaming_response.create(
-            model=self.tts_model,
-            voice=self.tts_voice,
-            input=text,
-            format="mp3",
-        ) as response:
-            response.stream_to_file(destination)
-        logger.info("Generated speech at %s", destination)
+
+        def synthesize() -> None:
+            destination.unlink(missing_ok=True)
+            with self.client.audio.speech.with_streaming_response.create(**self._speech_request(text)) as response:
+                response.stream_to_file(destination)
+            self._finish_speech(destination)
+
+        with self._metered_speech(text, destination):
+            retry_call("openai", synthesize)
+        if self.tts_cache is not None:
+            self.tts_cache.set_file(key, destination)
+        return destination
+
+
+class AsyncOpenAIWorkflow(_WorkflowBase):
+    """Coroutine counterpart of :class:`OpenAIWorkflow` built on ``AsyncOpenAI``.
+
+    Concurrency is bounded with semaphores instead of threads, so many segments
+    and projects can share one event loop.
+    """
+
+    def __init__(self, api_key: str, model: str, tts_model: str, tts_voice: str, tts_cache: Optional[DiskCache] = None, structured_output: bool = True, split_sentences: bool = False, chunk_workers: int = 4, tts_format: str = "mp3", base_url: Optional[str] = None) -> None:
+        super().__init__(model, tts_model, tts_voice, tts_cache, structured_output, split_sentences, chunk_workers, tts_format)
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    async def _complete(self, request: Dict[str, Any], operation: str = "responses") -> str:
+        with self._metered_response(request, operation) as metered:
+            response = await retry_call_async("openai", lambda: self.client.responses.create(**request))
+            metered.update(usage_amounts(getattr(response, "usage", None)))
+        return output_text(response)
+
+    async def _resume_outline(self, resume: OutlineResume) -> List[Dict[str, Any]]:
+        while (follow_up := resume.next_prompt()) is not None:
+            resume.add(await self._complete(self._outline_request(follow_up)))
+        return resume.added
+
+    async def _outline_items(self, user_prompt: str) -> List[Dict[str, Any]]:
+        resume = OutlineResume.from_response(user_prompt, await self._complete(self._outline_request(user_prompt)))
+        await self._resume_outline(resume)
+        return resume.items
+
+    async def generate_script_outline(self, transcripts: Iterable[str], prompt: str) -> List[SegmentPlan]:
+        with span("outline", "openai"):
+            return plans_from_items(await self._outline_items(outline_prompt(transcripts, prompt)))
+
+    async def stream_script_outline(self, transcripts: Iterable[str], prompt: str) -> AsyncIterator[SegmentPlan]:
+        user_prompt = outline_prompt(transcripts, prompt)
+        parser = SegmentStreamParser()
+        meter = _StreamMeter(model=self.model)
+        try:
+            stream = await retry_call_async("openai", lambda: self.client.responses.create(**self._outline_request(user_prompt, stream=True)))
+            async for event in stream:
+                for item in meter.segments(event, parser):
+                    with meter.suspended():
+                        yield SegmentPlan.from_dict(item)
+        except BaseException as exc:
+            meter.finish(exc)
+            raise
+        meter.finish()
+        resume = OutlineResume(user_prompt, parser.segments, parser.complete)
+        for item in await self._resume_outline(resume):
+            yield SegmentPlan.from_dict(item)
+        check_segment_count(len(resume.items))
+
+    async def summarize_chunk(self, chunk: str, cache: Optional[DiskCache] = None) -> str:
+        key = summary_key(self.model, chunk)
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return cached.decode("utf-8")
+        summary = await self._complete(self._summary_request(chunk), operation="responses.summary")
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, summary.encode("utf-8"))
+        return summary
+
+    async def generate_script_outline_map_reduce(
+        self,
+        transcripts: Iterable[str],
+        prompt: str,
+        chunk_tokens: int = 8000,
+        max_workers: int = 4,
+        cache: Optional[DiskCache] = None,
+    ) -> List[SegmentPlan]:
+        chunks = chunk_transcripts(list(transcripts), chunk_tokens, model=self.model)
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def summarize(chunk: str) -> str:
+            async with semaphore:
+                return await self.summarize_chunk(chunk, cache)
+
+        with span("outline.map", "openai", chunks=len(chunks)):
+            summaries = await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+        logger.info("Summarized %d transcript chunks", len(chunks))
+        with span("outline.reduce", "openai"):
+            return plans_from_items(await self._outline_items(reduce_prompt(summaries, prompt)))
+
+    async def generate_speech(self, text: str, destination: Path) -> Path:
+        parts = self._speech_parts(text, destination)
+        if len(parts) < 2:
+            return await self._synthesize(text, destination)
+        semaphore = asyncio.Semaphore(max(1, self.chunk_workers))
+
+        async def synthesize(chunk: str, part: Path) -> Path:
+            async with semaphore:
+                return await self._synthesize(chunk, part)
+
+        await asyncio.gather(*(synthesize(chunk, part) for chunk, part in parts))
+        return await asyncio.to_thread(self._join_speech, parts, destination)
+
+    async def _synthesize(self, text: str, destination: Path) -> Path:
+        key = self._speech_key(text)
+        if self.tts_cache is not None and await asyncio.to_thread(self.tts_cache.copy_to, key, destination):
+            logger.info("Reused cached speech for %s", destination)
+            return destination
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        async def synthesize() -> None:
+            destination.unlink(missing_ok=True)
+            async with self.client.audio.speech.with_streaming_response.create(**self._speech_request(text)) as response:
+                await response.stream_to_file(destination)
+            await asyncio.to_thread(self._finish_speech, destination)
+
+        with self._metered_speech(text, destination):
+            await retry_call_async("openai", synthesize)
+        if self.tts_cache is not None:
+            await asyncio.to_thread(self.tts_cache.set_file, key, destination)
         return destination
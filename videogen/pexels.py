@@ -3,17 +3,40 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
+import os
+import tempfile
+import threading
+import time
 import requests
 
-from .config import ensure_directory
+from .cache import DiskCache, link_or_copy, make_key
+from .config import VideoGenConfig, ensure_directory
+from .library import MediaLibrary, rendition_key
+from .metrics import get_metrics
+from .ratelimit import get_limiter, retry_call
+from .tracing import span
 
 
 logger = logging.getLogger(__name__)
 
 
-PEXELS_SEARCH_URL = "https://api.pexels.com/videos/search"
+PEXELS_API_URL = "https://api.pexels.com"
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+# Rough H.264 stock-footage density, used when a rendition does not state its size.
+BITS_PER_PIXEL = 0.1
+# Renditions are compared on their long edge, within this fraction of the
+# target's: Pexels lists crops such as 1920x1012 that should count as 1080p.
+SIZE_TOLERANCE = 0.95
+
+
+class IncompleteDownload(ConnectionError):
+    """The body ended before ``Content-Length`` bytes arrived; retried like a dropped connection."""
+
+
+# A connection cut mid-body usually surfaces as one of these rather than as a short read.
+DOWNLOAD_RETRY_EXCEPTIONS = (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)
 
 
 @dataclass
@@ -23,21 +46,186 @@ class PexelsVideo:
     title: str
     filepath: Path
     duration: float
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    quality: str = ""
+    estimated_bitrate: float = 0.0
+    # The largest rendition on offer, i.e. what the old max-width choice would have fetched.
+    largest_width: int = 0
+    largest_bitrate: float = 0.0
+    from_library: bool = False
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search, used for the request and its cache key."""
+    return " ".join(query.lower().split())
+
+
+def estimated_bitrate(item: Dict[str, Any], duration: float = 0.0) -> float:
+    """Bits per second of a rendition, from its size if listed, else from pixels and fps."""
+    if item.get("size") and duration:
+        return item["size"] * 8 / duration
+    return (item.get("width") or 0) * (item.get("height") or 0) * (item.get("fps") or 30) * BITS_PER_PIXEL
+
+
+def choose_rendition(video_files: List[Dict[str, Any]], width: int, height: int, fps: float, duration: float = 0.0) -> Dict[str, Any]:
+    """The cheapest MP4 rendition whose long edge covers that of ``width`` x ``height``.
+
+    Frame rates above ``fps`` only add decode work, so among covering files the
+    lowest estimated bitrate wins, which favours both the smaller size and the
+    lower frame rate. Without a covering file the largest one is used.
+    """
+    candidates = [item for item in video_files if item.get("link")]
+    if not candidates:
+        raise ValueError("Video has no downloadable files")
+    mp4 = [item for item in candidates if item.get("file_type", "video/mp4") == "video/mp4"]
+    candidates = mp4 or candidates
+
+    def covers(item: Dict[str, Any]) -> bool:
+        return max(item.get("width") or 0, item.get("height") or 0) >= max(width, height) * SIZE_TOLERANCE
+
+    def cost(item: Dict[str, Any]) -> Tuple[float, float]:
+        # Prefer the target frame rate over a higher one when bitrates tie.
+        return estimated_bitrate(item, duration), abs((item.get("fps") or fps) - fps)
+
+    covering = [item for item in candidates if covers(item)]
+    if covering:
+        return min(covering, key=cost)
+    return max(candidates, key=lambda item: ((item.get("width") or 0) * (item.get("height") or 0), -cost(item)[0]))
 
 
 class PexelsClient:
-    """Simple wrapper around the Pexels API."""
+    """Simple wrapper around the Pexels API.
 
-    def __init__(self, api_key: str, download_dir: Path) -> None:
+    The client is shared by worker threads; ``search_workers`` and
+    ``download_workers`` bound the concurrent API searches and file downloads
+    separately, whatever the size of the calling pool. With a ``library``,
+    renditions fetched before, by this or another process, are not downloaded
+    again, and a ``search_cache`` answers repeated searches without the API.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        download_dir: Path,
+        base_url: Optional[str] = None,
+        search_workers: int = 2,
+        download_workers: int = 4,
+        chunk_bytes: int = DOWNLOAD_CHUNK_BYTES,
+        verify_size: bool = True,
+        target_size: Tuple[int, int] = (1920, 1080),
+        target_fps: float = 30,
+        library: Optional[MediaLibrary] = None,
+        search_cache: Optional[DiskCache] = None,
+    ) -> None:
         self.api_key = api_key
+        self.library = library
+        self.search_cache = search_cache
+        self.target_size = target_size
+        self.target_fps = target_fps
+        self.chunk_bytes = max(1, chunk_bytes)
+        self.verify_size = verify_size
         self.download_dir = ensure_directory(download_dir)
+        self.search_url = f"{(base_url or PEXELS_API_URL).rstrip('/')}/videos/search"
+        self.search_workers = max(1, search_workers)
+        self.download_workers = max(1, download_workers)
+        self.search_slots = threading.BoundedSemaphore(self.search_workers)
+        self.download_slots = threading.BoundedSemaphore(self.download_workers)
+        self.downloads = 0
+        self.downloaded_bytes = 0
+        self._active = 0
+        self._busy_since = 0.0
+        self._busy_seconds = 0.0
+        self._lock = threading.Lock()
 
-    def search_video(self, query: str, min_duration: int = 5, max_duration: int = 90) -> Optional[dict]:
-        headers = {"Authorization": self.api_key}
-        params = {"query": query, "per_page": 1, "orientation": "landscape"}
-        response = requests.get(PEXELS_SEARCH_URL, headers=headers, params=params, timeout=30)
+    @classmethod
+    def from_config(cls, config: VideoGenConfig) -> "PexelsClient":
+        """A client with the worker limits, render target and caches of ``config``."""
+        return cls(
+            config.pexels_api_key,
+            config.working_dir / "video",
+            base_url=config.pexels_base_url,
+            search_workers=config.pexels_search_workers,
+            download_workers=config.pexels_download_workers,
+            chunk_bytes=config.pexels_chunk_bytes,
+            target_size=(config.render_width, config.render_height),
+            target_fps=config.render_fps,
+            library=MediaLibrary(config.cache_dir / "media", max_bytes=config.media_library_max_bytes) if config.use_cache else None,
+            search_cache=DiskCache(config.cache_dir / "pexels_search", ttl=config.pexels_search_cache_ttl) if config.use_cache else None,
+        )
+
+    def _download_started(self) -> None:
+        with self._lock:
+            if self._active == 0:
+                self._busy_since = time.perf_counter()
+            self._active += 1
+
+    def _download_finished(self, size: int) -> None:
+        with self._lock:
+            self._active -= 1
+            if size:
+                self.downloads += 1
+                self.downloaded_bytes += size
+            if self._active == 0:
+                self._busy_seconds += time.perf_counter() - self._busy_since
+
+    @property
+    def download_seconds(self) -> float:
+        """Wall time during which at least one download was in flight."""
+        with self._lock:
+            if self._active:
+                return self._busy_seconds + time.perf_counter() - self._busy_since
+            return self._busy_seconds
+
+    @property
+    def throughput(self) -> float:
+        """Aggregate download rate in bytes per second across all workers."""
+        seconds = self.download_seconds
+        return self.downloaded_bytes / seconds if seconds else 0.0
+
+    @staticmethod
+    def _get(url: str, provider: str, **kwargs: Any) -> requests.Response:
+        response = requests.get(url, **kwargs)
+        get_limiter().observe(provider, response.headers)
         response.raise_for_status()
+        return response
+
+    def _stream_to(self, url: str, destination: Path) -> int:
+        """Write the body of ``url`` to ``destination`` chunk by chunk; returns its size."""
+        with requests.get(url, stream=True, timeout=60) as response:
+            get_limiter().observe("pexels-cdn", response.headers)
+            response.raise_for_status()
+            # A content-encoded body is decoded on the fly and no longer matches the header.
+            expected = None if response.headers.get("Content-Encoding") else response.headers.get("Content-Length")
+            size = 0
+            with open(destination, "wb") as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    file.write(chunk)
+                    size += len(chunk)
+        if self.verify_size and expected is not None and size != int(expected):
+            raise IncompleteDownload(f"{url}: received {size} of {expected} bytes")
+        return size
+
+    def search_videos(self, query: str, per_page: int = 1, orientation: str = "landscape") -> Dict[str, Any]:
+        """The ``/videos/search`` response for ``query``, from the search cache when fresh."""
+        params = {"query": normalize_query(query), "per_page": per_page, "orientation": orientation}
+        key = make_key("pexels-search", self.search_url, params)
+        if self.search_cache is not None:
+            cached = self.search_cache.get_json(key)
+            if cached is not None:
+                return cached
+        headers = {"Authorization": self.api_key}
+        with self.search_slots, span("pexels.search", "pexels", query=params["query"]), get_metrics().measure("pexels", "search") as metered:
+            response = retry_call("pexels", lambda: self._get(self.search_url, "pexels", headers=headers, params=params, timeout=30))
+            metered["bytes_in"] = len(response.content)
         data = response.json()
+        if self.search_cache is not None:
+            self.search_cache.set_json(key, data)
+        return data
+
+    def search_video(self, query: str, min_duration: int = 5, max_duration: int = 90) -> Optional[dict]:
+        data = self.search_videos(query)
         for video in data.get("videos", []):
             duration = video.get("duration") or 0
             if min_duration <= duration <= max_duration:
@@ -46,19 +234,67 @@ class PexelsClient:
 
     def download_video(self, video: dict, filename_hint: str) -> PexelsVideo:
         video_files = video.get("video_files", [])
-        if not video_files:
-            raise ValueError("Video has no downloadable files")
-        # Choose the highest resolution file with reasonable size
-        chosen = max(video_files, key=lambda item: item.get("width", 0))
+        duration = video.get("duration") or 0.0
+        chosen = choose_rendition(video_files, *self.target_size, self.target_fps, duration)
+        largest = max(video_files, key=lambda item: item.get("width") or 0)
         url = chosen["link"]
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
         safe_name = "_".join(filename_hint.lower().split()) or "segment"
         filepath = self.download_dir / f"{safe_name}.mp4"
-        with open(filepath, "wb") as file:
-            file.write(response.content)
-        logger.info("Downloaded Pexels video to %s", filepath)
-        return PexelsVideo(title=video.get("url", "Pexels Video"), filepath=filepath, duration=video.get("duration", 0.0))
+        details = dict(
+            width=chosen.get("width") or 0,
+            height=chosen.get("height") or 0,
+            fps=chosen.get("fps") or 0.0,
+        )
+        audit = dict(
+            details,
+            quality=chosen.get("quality") or "",
+            estimated_bitrate=estimated_bitrate(chosen, duration),
+            largest_width=largest.get("width") or 0,
+            largest_bitrate=estimated_bitrate(largest, duration),
+        )
+        library = self.library if video.get("id") is not None else None
+        rendition = rendition_key(chosen)
+        if library is not None:
+            if library.checkout(video["id"], rendition, filepath, query=filename_hint) is not None:
+                logger.info("Reused Pexels video %s from the media library at %s", video["id"], filepath)
+                return PexelsVideo(title=video.get("url", "Pexels Video"), filepath=filepath, duration=video.get("duration", 0.0), from_library=True, **audit)
+        target = library.path_for(video["id"], rendition) if library is not None else filepath
+        with self.download_slots, span("pexels.download", "pexels", url=url, width=chosen.get("width"), height=chosen.get("height"), fps=chosen.get("fps")), get_metrics().measure("pexels", "download") as metered:
+            self._download_started()
+            size = 0
+            temp_path: Optional[Path] = None
+            try:
+                # Stream into a temporary file next to the target so a failed or
+                # concurrent download never leaves a truncated clip under the final name.
+                descriptor, temp_name = tempfile.mkstemp(dir=ensure_directory(target.parent), prefix=".tmp-", suffix=".part")
+                os.close(descriptor)
+                temp_path = Path(temp_name)
+                size = metered["bytes_in"] = retry_call(
+                    "pexels-cdn",
+                    lambda: self._stream_to(url, temp_path),
+                    retry_exceptions=DOWNLOAD_RETRY_EXCEPTIONS,
+                )
+                os.replace(temp_path, target)
+            except BaseException:
+                if temp_path is not None:
+                    temp_path.unlink(missing_ok=True)
+                raise
+            finally:
+                self._download_finished(size)
+        if library is not None:
+            # Link before indexing, so the eviction that follows cannot take the clip away.
+            link_or_copy(target, filepath)
+            library.add(video["id"], rendition, duration=duration, query=filename_hint, **details)
+        logger.info(
+            "Downloaded Pexels video to %s (%sx%s@%s, largest offered %sx%s)",
+            filepath,
+            chosen.get("width"),
+            chosen.get("height"),
+            chosen.get("fps"),
+            largest.get("width"),
+            largest.get("height"),
+        )
+        return PexelsVideo(title=video.get("url", "Pexels Video"), filepath=filepath, duration=video.get("duration", 0.0), **audit)
 
     def search_and_download(self, query: str) -> Optional[PexelsVideo]:
         video = self.search_video(query)
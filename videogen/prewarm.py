@@ -0,0 +1,83 @@
+"""Fill the Pexels search cache, and optionally the media library, from a keyword list.
+
+    python -m videogen.prewarm keywords.txt --download
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, List, Tuple
+import argparse
+import logging
+import sys
+
+from .config import VideoGenConfig
+from .pexels import PexelsClient, normalize_query
+from .ratelimit import configure_limiter, parse_limits
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_queries(sources: Iterable[str]) -> List[str]:
+    """One query per line from each file (``-`` for stdin); blank lines and ``#`` comments are skipped."""
+    queries: List[str] = []
+    seen = set()
+    for source in sources:
+        text = sys.stdin.read() if source == "-" else Path(source).read_text(encoding="utf-8")
+        for line in text.splitlines():
+            query = normalize_query(line.split("#", 1)[0])
+            if query and query not in seen:
+                seen.add(query)
+                queries.append(query)
+    return queries
+
+
+def prewarm(client: PexelsClient, queries: List[str], download: bool = False) -> Tuple[int, List[str]]:
+    """Search every query through ``client``'s cache.
+
+    Returns how many queries found a usable video and the queries that
+    failed; a failing query is logged and does not stop the others.
+    """
+    fetch = client.search_and_download if download else client.search_video
+
+    def attempt(query: str) -> Tuple[Any, bool]:
+        try:
+            return fetch(query), True
+        except Exception as exc:
+            logger.warning("Pre-warming '%s' failed: %s", query, exc)
+            return None, False
+
+    workers = client.search_workers + (client.download_workers if download else 0)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = list(pool.map(attempt, queries))
+    found = sum(1 for result, _ in outcomes if result)
+    failed = [query for query, (_, ok) in zip(queries, outcomes) if not ok]
+    logger.info("Warmed %d queries, %d with a usable video, %d failed", len(queries), found, len(failed))
+    return found, failed
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-warm the Pexels search cache from a keyword list")
+    parser.add_argument("files", nargs="*", help="Files with one query per line, - for stdin (default without --query)")
+    parser.add_argument("--query", action="append", default=[], help="An extra query; may be repeated")
+    parser.add_argument("--download", action="store_true", help="Also fetch the chosen clips into the media library")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    config = VideoGenConfig.from_environment(services=("pexels",))
+    if not config.use_cache:
+        parser.error("caching is disabled (VIDEOGEN_NO_CACHE), there is nothing to warm")
+    configure_limiter(config.cache_dir / "ratelimit.sqlite3", parse_limits(config.rate_limits))
+    client = PexelsClient.from_config(config)
+    queries = read_queries(args.files or ([] if args.query else ["-"]))
+    queries += [query for query in map(normalize_query, args.query) if query and query not in queries]
+    _, failed = prewarm(client, queries, download=args.download)
+    logger.info("Pexels search cache: %d hits, %d misses", client.search_cache.hits, client.search_cache.misses)
+    if failed:
+        logger.error("Failed queries: %s", ", ".join(failed))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,7 +1,7 @@
 """Project data structures and serialization."""
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import List, Dict, Any
 import json
@@ -40,12 +40,14 @@ class VideoProject:
     name: str
     segments: List[ProjectSegment]
     render_path: Path
+    metrics: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "name": self.name,
             "render_path": str(self.render_path),
             "segments": [segment.to_dict() for segment in self.segments],
+            "metrics": self.metrics,
         }
 
     def save(self, destination: Path) -> Path:
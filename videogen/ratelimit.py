@@ -0,0 +1,356 @@
+"""Shared token-bucket rate limiting and retry for outbound API calls."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Mapping, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+
+import openai
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Sustained requests per second and the burst allowed on top of it."""
+
+    rate: float
+    burst: float
+
+
+DEFAULT_LIMITS: Dict[str, Limit] = {
+    "openai": Limit(rate=5.0, burst=10),
+    # Pexels' default quota is 200 requests per hour.
+    "pexels": Limit(rate=200 / 3600, burst=50),
+    "pexels-cdn": Limit(rate=20.0, burst=20),
+    "youtube": Limit(rate=2.0, burst=5),
+}
+
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS: Tuple[type, ...] = (
+    ConnectionError,
+    TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+    openai.APIConnectionError,
+)
+
+# Multiplier applied to a provider's rate after a 429, and the floor it can reach.
+BACKOFF_SCALE = 0.5
+MIN_SCALE = 0.1
+# Per successful call the scale creeps back towards 1.
+RECOVERY_STEP = 0.05
+
+
+def parse_limits(spec: str) -> Dict[str, Limit]:
+    """Parse ``"openai=5:10,pexels=0.05:50"`` into per-provider limits."""
+    limits: Dict[str, Limit] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        rate, _, burst = values.partition(":")
+        limits[name.strip()] = Limit(rate=float(rate), burst=float(burst) if burst else max(1.0, float(rate)))
+    return limits
+
+
+class MemoryBucketStore:
+    """Bucket state shared by the threads of one process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, list] = {}
+
+    def _bucket(self, provider: str, limit: Limit, now: float) -> list:
+        # tokens, updated, blocked_until, scale
+        return self._buckets.setdefault(provider, [limit.burst, now, 0.0, 1.0])
+
+    def reserve(self, provider: str, limit: Limit) -> float:
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(provider, limit, now)
+            return _reserve(bucket, limit, now)
+
+    def penalize(self, provider: str, limit: Limit, delay: float) -> None:
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(provider, limit, now)
+            _penalize(bucket, now, delay)
+
+    def recover(self, provider: str, limit: Limit) -> None:
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is not None:
+                bucket[3] = min(1.0, bucket[3] + RECOVERY_STEP)
+
+
+class SQLiteBucketStore:
+    """Bucket state kept in a SQLite file so several processes on a host share it."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "provider TEXT PRIMARY KEY, tokens REAL, updated REAL, blocked_until REAL, scale REAL)"
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def _update(self, provider: str, limit: Limit, change: Callable[[list, float], float]) -> float:
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT tokens, updated, blocked_until, scale FROM buckets WHERE provider = ?", (provider,)
+            ).fetchone()
+            bucket = list(row) if row else [limit.burst, now, 0.0, 1.0]
+            result = change(bucket, now)
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (provider, tokens, updated, blocked_until, scale) VALUES (?, ?, ?, ?, ?)",
+                (provider, *bucket),
+            )
+        return result
+
+    def reserve(self, provider: str, limit: Limit) -> float:
+        return self._update(provider, limit, lambda bucket, now: _reserve(bucket, limit, now))
+
+    def penalize(self, provider: str, limit: Limit, delay: float) -> None:
+        self._update(provider, limit, lambda bucket, now: _penalize(bucket, now, delay))
+
+    def recover(self, provider: str, limit: Limit) -> None:
+        # Nearly every call succeeds at full rate; a plain read avoids taking the write lock then.
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            row = connection.execute("SELECT scale FROM buckets WHERE provider = ?", (provider,)).fetchone()
+        finally:
+            connection.close()
+        if row is None or row[0] >= 1.0:
+            return
+
+        def change(bucket: list, now: float) -> float:
+            bucket[3] = min(1.0, bucket[3] + RECOVERY_STEP)
+            return 0.0
+
+        self._update(provider, limit, change)
+
+
+def _reserve(bucket: list, limit: Limit, now: float) -> float:
+    """Take one token, returning how long the caller must wait before using it."""
+    tokens, updated, blocked_until, scale = bucket
+    rate = limit.rate * scale
+    tokens = min(limit.burst, tokens + (now - updated) * rate) - 1.0
+    bucket[0], bucket[1] = tokens, now
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return max(wait, blocked_until - now)
+
+
+def _penalize(bucket: list, now: float, delay: float) -> float:
+    bucket[2] = max(bucket[2], now + delay)
+    bucket[3] = max(MIN_SCALE, bucket[3] * BACKOFF_SCALE)
+    return 0.0
+
+
+class RateLimiter:
+    """Per-provider token buckets with adaptive backoff after rate-limit responses."""
+
+    def __init__(self, store: Any = None, limits: Optional[Mapping[str, Limit]] = None) -> None:
+        self.store = store or MemoryBucketStore()
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+
+    def _limit(self, provider: str) -> Limit:
+        return self.limits.get(provider) or Limit(rate=10.0, burst=10)
+
+    def reserve(self, provider: str) -> float:
+        return self.store.reserve(provider, self._limit(provider))
+
+    def acquire(self, provider: str) -> None:
+        """Block until a request to ``provider`` may be sent."""
+        wait = self.reserve(provider)
+        if wait > 0:
+            logger.debug("Throttling %s for %.2fs", provider, wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, provider: str) -> None:
+        # The SQLite store may wait on another process's lock; keep that off the event loop.
+        wait = await asyncio.to_thread(self.reserve, provider)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, provider: str, delay: float) -> None:
+        """Pause every caller of ``provider`` for ``delay`` seconds and slow its rate."""
+        self.store.penalize(provider, self._limit(provider), delay)
+
+    def recover(self, provider: str) -> None:
+        self.store.recover(provider, self._limit(provider))
+
+    def observe(self, provider: str, headers: Mapping[str, str]) -> None:
+        """Pause ``provider`` early when response headers report an exhausted quota."""
+        remaining = _header(headers, "x-ratelimit-remaining", "x-ratelimit-remaining-requests")
+        if remaining is not None and remaining.strip() == "0":
+            delay = _reset_delay(headers)
+            if delay:
+                logger.warning("%s quota exhausted, pausing for %.1fs", provider, delay)
+                self.penalize(provider, delay)
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    return _limiter
+
+
+def configure_limiter(path: Optional[Path] = None, limits: Optional[Mapping[str, Limit]] = None) -> RateLimiter:
+    """Replace the process-wide limiter, optionally backed by a shared SQLite file."""
+    global _limiter
+    store = SQLiteBucketStore(path) if path else MemoryBucketStore()
+    _limiter = RateLimiter(store, limits)
+    return _limiter
+
+
+def _header(headers: Optional[Mapping[str, str]], *names: str) -> Optional[str]:
+    if not headers:
+        return None
+    lowered = {str(key).lower(): value for key, value in headers.items()}
+    for name in names:
+        if name in lowered:
+            return str(lowered[name])
+    return None
+
+
+_DURATION_RE = re.compile(r"([\d.]+)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _reset_delay(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds until the provider accepts requests again, from the usual headers."""
+    value = _header(headers, "retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    value = _header(headers, "x-ratelimit-reset-requests", "x-ratelimit-reset")
+    if value:
+        parts = _DURATION_RE.findall(value)
+        if parts:  # OpenAI style, e.g. "6m0s"
+            return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+        try:
+            reset = float(value)
+        except ValueError:
+            return None
+        # Pexels sends an epoch timestamp, others a number of seconds.
+        return max(0.0, reset - time.time()) if reset > 1e9 else reset
+    return None
+
+
+def _status_and_headers(exc: BaseException) -> Tuple[Optional[int], Optional[Mapping[str, str]]]:
+    """Pull the HTTP status and headers out of requests, OpenAI and Google API errors."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None)
+    resp = getattr(exc, "resp", None)  # googleapiclient.errors.HttpError
+    if status is None and resp is not None:
+        status = getattr(resp, "status", None)
+        headers = resp
+    return (int(status) if status is not None else None), headers
+
+
+def retry_delay(exc: BaseException, attempt: int, retry_exceptions: Tuple[type, ...] = ()) -> Optional[float]:
+    """Seconds to wait before retrying after ``exc``, or ``None`` if it is not retryable."""
+    status, headers = _status_and_headers(exc)
+    if status is None:
+        if not isinstance(exc, RETRY_EXCEPTIONS + retry_exceptions):
+            return None
+    elif status not in RETRY_STATUSES:
+        return None
+    backoff = min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+    return max(backoff, _reset_delay(headers) or 0.0)
+
+
+def retry_call(
+    provider: str,
+    func: Callable[[], T],
+    max_attempts: int = 5,
+    retry_exceptions: Tuple[type, ...] = (),
+    limiter: Optional[RateLimiter] = None,
+) -> T:
+    """Call ``func`` under ``provider``'s rate limit, retrying transient failures.
+
+    Backoff is exponential with jitter, stretched to honour ``Retry-After`` and
+    rate-limit reset headers. A 429 also pauses and slows every other caller
+    sharing the limiter.
+    """
+    limiter = limiter or get_limiter()
+    attempt = 0
+    while True:
+        limiter.acquire(provider)
+        try:
+            result = func()
+        except Exception as exc:
+            attempt += 1
+            delay = retry_delay(exc, attempt, retry_exceptions)
+            if delay is None or attempt >= max_attempts:
+                raise
+            if _status_and_headers(exc)[0] == 429:
+                limiter.penalize(provider, delay)
+            logger.warning("%s call failed (%s), retrying in %.1fs", provider, exc, delay)
+            time.sleep(delay)
+            continue
+        limiter.recover(provider)
+        return result
+
+
+async def retry_call_async(
+    provider: str,
+    func: Callable[[], Awaitable[T]],
+    max_attempts: int = 5,
+    retry_exceptions: Tuple[type, ...] = (),
+    limiter: Optional[RateLimiter] = None,
+) -> T:
+    """Coroutine counterpart of :func:`retry_call`; ``func`` returns an awaitable."""
+    limiter = limiter or get_limiter()
+    attempt = 0
+    while True:
+        await limiter.acquire_async(provider)
+        try:
+            result = await func()
+        except Exception as exc:
+            attempt += 1
+            delay = retry_delay(exc, attempt, retry_exceptions)
+            if delay is None or attempt >= max_attempts:
+                raise
+            if _status_and_headers(exc)[0] == 429:
+                await asyncio.to_thread(limiter.penalize, provider, delay)
+            logger.warning("%s call failed (%s), retrying in %.1fs", provider, exc, delay)
+            await asyncio.sleep(delay)
+            continue
+        await asyncio.to_thread(limiter.recover, provider)
+        return result
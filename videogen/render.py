@@ -2,41 +2,85 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional, Tuple
 import logging
+import subprocess
 
+from moviepy.config import get_setting
 from moviepy.editor import AudioFileClip, VideoFileClip, concatenate_videoclips
 
+from .audio import JOINABLE_FORMATS, MUXABLE_FORMATS, join_audio_files
 from .project import ProjectSegment
+from .tracing import span
 
 
 logger = logging.getLogger(__name__)
 
 
-def prepare_clip(segment: ProjectSegment) -> VideoFileClip:
-    """Load and align a video clip with its narration audio."""
-    audio_clip = AudioFileClip(str(segment.speech_path))
+def prepare_clip(segment: ProjectSegment, with_audio: bool = True, size: Tuple[int, int] = (1920, 1080)) -> VideoFileClip:
+    """Load and align a video clip with its narration audio.
+
+    Without ``with_audio`` the clip is only cut to the segment's probed
+    duration and the narration is left for the caller to mux in.
+    """
+    audio_clip = AudioFileClip(str(segment.speech_path)) if with_audio else None
+    duration = audio_clip.duration if audio_clip is not None else segment.duration
     if segment.video_path:
-        video_clip = VideoFileClip(str(segment.video_path))
+        video_clip = VideoFileClip(str(segment.video_path), audio=False)
     else:  # fallback to a blank color clip if no video is available
         from moviepy.editor import ColorClip
 
-        video_clip = ColorClip(size=(1920, 1080), color=(0, 0, 0), duration=audio_clip.duration)
-    if video_clip.duration < audio_clip.duration:
-        loops = int(audio_clip.duration // video_clip.duration) + 1
+        video_clip = ColorClip(size=size, color=(0, 0, 0), duration=duration)
+    if video_clip.duration < duration:
+        loops = int(duration // video_clip.duration) + 1
         clips = [video_clip] * loops
         video_clip = concatenate_videoclips(clips)
-    video_clip = video_clip.subclip(0, audio_clip.duration)
-    video_clip = video_clip.set_audio(audio_clip)
+    video_clip = video_clip.subclip(0, duration)
+    if audio_clip is not None:
+        video_clip = video_clip.set_audio(audio_clip)
     return video_clip
 
 
-def render_project(segments: Iterable[ProjectSegment], destination: Path, fps: int = 30) -> Path:
-    """Render the list of segments into a single video file."""
-    clips = [prepare_clip(segment) for segment in segments]
+def _mux(video_path: Path, audio_path: Path, audio_format: str, destination: Path) -> None:
+    """Combine a silent video and a narration track by copying both streams."""
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-v", "error", "-i", str(video_path), "-i", str(audio_path), "-map", "0:v:0", "-map", "1:a:0", "-c", "copy"]
+    if audio_format == "aac":
+        command += ["-bsf:a", "aac_adtstoasc"]
+    subprocess.run(command + ["-movflags", "+faststart", str(destination)], check=True)
+
+
+def render_project(segments: Iterable[ProjectSegment], destination: Path, fps: int = 30, audio_format: Optional[str] = None, size: Tuple[int, int] = (1920, 1080)) -> Path:
+    """Render the list of segments into a single video file.
+
+    When the narration is in a format MP4 can carry as-is (AAC, MP3), the
+    video is encoded without audio and the joined narration is muxed in by
+    stream copy, skipping the decode/re-encode of every segment's audio.
+    Other formats go through MoviePy's audio path; WAV/PCM is cheap to decode
+    there.
+    """
+    segments = list(segments)
+    direct = audio_format in MUXABLE_FORMATS and audio_format in JOINABLE_FORMATS
+    clips = []
+    for segment in segments:
+        with span("render.prepare_clip", "render", index=segment.index):
+            clips.append(prepare_clip(segment, with_audio=not direct, size=size))
     final_clip = concatenate_videoclips(clips, method="compose")
     destination.parent.mkdir(parents=True, exist_ok=True)
-    final_clip.write_videofile(str(destination), fps=fps)
+    if direct:
+        video_only = destination.with_name(f"{destination.stem}.video{destination.suffix}")
+        narration = destination.with_name(f"{destination.stem}.narration.{audio_format}")
+        try:
+            with span("render.encode", "render", fps=fps, audio=False):
+                final_clip.write_videofile(str(video_only), fps=fps, audio=False)
+            with span("render.mux", "render", format=audio_format):
+                join_audio_files([segment.speech_path for segment in segments], narration, audio_format)
+                _mux(video_only, narration, audio_format, destination)
+        finally:
+            video_only.unlink(missing_ok=True)
+            narration.unlink(missing_ok=True)
+    else:
+        with span("render.encode", "render", fps=fps, audio=True):
+            final_clip.write_videofile(str(destination), fps=fps)
     final_clip.close()
     for clip in clips:
         clip.close()
@@ -0,0 +1,9 @@
+"""Local stand-ins for the OpenAI, Pexels and YouTube APIs.
+
+They let the pipeline run, be load-tested and be benchmarked without keys
+or network access. Start them with ``python -m videogen.standins`` and
+export the printed variables, or use :func:`start_standins` in-process.
+"""
+from .server import ServiceBehavior, StandInServer, StandInSettings, parse_behaviors, start_standins
+
+__all__ = ["ServiceBehavior", "StandInServer", "StandInSettings", "parse_behaviors", "start_standins"]
@@ -0,0 +1,68 @@
+"""Run the stand-in APIs in the foreground and print the variables that target them."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+import argparse
+import logging
+
+from .server import StandInServer, StandInSettings, parse_behaviors
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve offline stand-ins for the OpenAI, Pexels and YouTube APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--behavior",
+        default="",
+        help="Per-service latency:error_rate:bandwidth:status, e.g. 'openai=0.8:0.02,pexels-cdn=0.05:0:4000000,speech=0:0.1::429' "
+        "(services: openai, speech, pexels, pexels-cdn, transcripts, upload, or * for all)",
+    )
+    parser.add_argument("--segments", type=int, default=6, help="Segments in every generated outline")
+    parser.add_argument("--script-words", type=int, default=120, help="Words of narration per segment")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Pace of streamed outline output")
+    parser.add_argument("--clip-size", default="1280x720", help="Resolution of the largest stock rendition")
+    parser.add_argument("--clip-seconds", type=float, default=10.0)
+    parser.add_argument("--clip-fps", type=int, default=25)
+    parser.add_argument("--clip-bitrate", default="2M")
+    parser.add_argument("--missing-video-ratio", type=float, default=0.0, help="Share of stock searches that find nothing")
+    parser.add_argument("--transcript-words", type=int, default=3000)
+    parser.add_argument("--upload-accept-bytes", type=int, default=0, help="Keep only this much of each upload chunk so clients must resume")
+    parser.add_argument("--media-dir", type=Path, help="Where generated media is kept between runs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    width, _, height = args.clip_size.partition("x")
+    settings = StandInSettings(
+        host=args.host,
+        port=args.port,
+        seed=args.seed,
+        behaviors=parse_behaviors(args.behavior),
+        segments=args.segments,
+        script_words=args.script_words,
+        output_tokens_per_second=args.tokens_per_second,
+        clip_width=int(width),
+        clip_height=int(height),
+        clip_seconds=args.clip_seconds,
+        clip_fps=args.clip_fps,
+        clip_bitrate=args.clip_bitrate,
+        missing_video_ratio=args.missing_video_ratio,
+        transcript_words=args.transcript_words,
+        upload_accept_bytes=args.upload_accept_bytes,
+        media_dir=args.media_dir,
+    )
+    server = StandInServer(settings)
+    for name, value in server.environment().items():
+        print(f"export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Deterministic synthetic text: captions, outlines and chunk summaries."""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+import random
+
+
+_WORDS = (
+    "video energy market growth study people city water design model future system data "
+    "history science money power river mountain music story team project camera light "
+    "engine network ocean forest planet signal theory change process method result value "
+    "question answer example problem simple early large small fast slow open clear"
+).split()
+
+_TAGS = ("[Music]", "[Applause]", "[Laughter]")
+
+
+def words(rng: random.Random, count: int) -> List[str]:
+    return [rng.choice(_WORDS) for _ in range(count)]
+
+
+def sentences(rng: random.Random, word_count: int) -> str:
+    """Roughly ``word_count`` words of sentence-shaped filler."""
+    result: List[str] = []
+    remaining = word_count
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 18))
+        sentence = words(rng, length)
+        result.append(" ".join(sentence).capitalize() + ".")
+        remaining -= length
+    return " ".join(result)
+
+
+def transcript_entries(rng: random.Random, word_count: int) -> List[Dict[str, Any]]:
+    """Caption entries shaped like ``YouTubeTranscriptApi.get_transcript`` output.
+
+    Like real auto-captions they include bracketed tags and lines repeated
+    across neighbouring entries, so normalization has work to do.
+    """
+    entries: List[Dict[str, Any]] = []
+    start = 0.0
+    remaining = word_count
+    previous = ""
+    while remaining > 0:
+        duration = round(rng.uniform(1.5, 4.0), 2)
+        roll = rng.random()
+        if roll < 0.03:
+            text = rng.choice(_TAGS)
+        elif roll < 0.10 and previous:
+            text = previous
+        else:
+            length = min(remaining, rng.randint(4, 10))
+            text = " ".join(words(rng, length))
+            remaining -= length
+        entries.append({"text": text, "start": round(start, 2), "duration": duration})
+        previous = text
+        start += duration
+    return entries
+
+
+def outline(rng: random.Random, segment_count: int, script_words: int) -> Dict[str, Any]:
+    """An outline document that satisfies ``OUTLINE_SCHEMA``."""
+    segments = []
+    for index in range(segment_count):
+        keywords = words(rng, 2)
+        segments.append({
+            "title": f"Part {index + 1}: {' '.join(keywords).title()}",
+            "summary": sentences(rng, 15),
+            "script": sentences(rng, script_words),
+            "keywords": keywords,
+        })
+    return {"segments": segments}
+
+
+def summary(rng: random.Random, word_count: int) -> str:
+    return "\n".join(f"- {line}" for line in sentences(rng, word_count).split(". "))
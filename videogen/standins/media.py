@@ -0,0 +1,128 @@
+"""Synthetic narration and stock footage for the stand-in servers."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+from ..audio import pcm_to_wav
+
+
+logger = logging.getLogger(__name__)
+
+
+# ffmpeg output options matching what the OpenAI speech endpoint returns per format.
+SPEECH_ENCODERS: Dict[str, List[str]] = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"],
+    "aac": ["-c:a", "aac", "-b:a", "64k", "-f", "adts"],
+    "opus": ["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"],
+    "flac": ["-c:a", "flac", "-f", "flac"],
+    "wav": ["-c:a", "pcm_s16le", "-f", "wav"],
+    "pcm": ["-c:a", "pcm_s16le", "-f", "s16le"],
+}
+
+SPEECH_CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "aac": "audio/aac",
+    "opus": "audio/ogg",
+    "flac": "audio/flac",
+    "wav": "audio/wav",
+    "pcm": "audio/pcm",
+}
+
+SAMPLE_RATE = 24000
+
+# One silent MPEG-2 Layer III frame: 24 kHz, 64 kbit/s, mono, 576 samples.
+_SILENT_MP3_FRAME = b"\xff\xf3\x84\xc0" + bytes(188)
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Locate ffmpeg the same way MoviePy does, falling back to ``PATH``."""
+    for variable in ("FFMPEG_BINARY", "IMAGEIO_FFMPEG_EXE"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+class MediaFactory:
+    """Render test-source media with ffmpeg once per parameter set and reuse it.
+
+    Durations are rounded to half a second so the many slightly different
+    narration lengths of a run share a handful of files.
+    """
+
+    def __init__(self, directory: Path, ffmpeg: Optional[str] = None) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+        self._lock = threading.Lock()
+        self._paths: Dict[Tuple, Path] = {}
+        if not self.ffmpeg:
+            logger.warning("ffmpeg not found; only mp3, wav and pcm narration can be synthesized and no video")
+
+    def _render(self, key: Tuple, name: str, build) -> Path:
+        with self._lock:
+            path = self._paths.get(key)
+            if path is None:
+                path = self.directory / name
+                if not path.exists():
+                    temporary = path.with_name(f".{path.name}.tmp")
+                    build(temporary)
+                    os.replace(temporary, path)
+                self._paths[key] = path
+            return path
+
+    def _ffmpeg(self, arguments: List[str], destination: Path) -> None:
+        if not self.ffmpeg:
+            raise RuntimeError("ffmpeg is required to synthesize this media")
+        subprocess.run([self.ffmpeg, "-y", "-v", "error", *arguments, str(destination)], check=True)
+
+    def speech(self, audio_format: str, seconds: float) -> Path:
+        """A tone of roughly ``seconds`` encoded like the speech endpoint's ``audio_format``."""
+        seconds = max(0.5, round(seconds * 2) / 2)
+        frequency = 180 + int(seconds * 10) % 200
+
+        def build(destination: Path) -> None:
+            if self.ffmpeg:
+                source = f"sine=frequency={frequency}:sample_rate={SAMPLE_RATE}:duration={seconds}"
+                self._ffmpeg(["-f", "lavfi", "-i", source, "-ac", "1", *SPEECH_ENCODERS[audio_format]], destination)
+            else:
+                destination.write_bytes(silent_speech(audio_format, seconds))
+
+        return self._render(("speech", audio_format, seconds), f"speech_{seconds:g}s.{audio_format}", build)
+
+    def video(self, width: int, height: int, seconds: float, fps: int, bitrate: str) -> Path:
+        """An H.264 MP4 of ffmpeg's ``testsrc2`` pattern."""
+
+        def build(destination: Path) -> None:
+            source = f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}"
+            self._ffmpeg(
+                ["-f", "lavfi", "-i", source, "-c:v", "libx264", "-preset", "ultrafast", "-b:v", bitrate,
+                 "-pix_fmt", "yuv420p", "-movflags", "+faststart", "-f", "mp4"],
+                destination,
+            )
+
+        return self._render(("video", width, height, seconds, fps, bitrate), f"clip_{width}x{height}_{fps}fps_{seconds:g}s_{bitrate}.mp4", build)
+
+
+def silent_speech(audio_format: str, seconds: float) -> bytes:
+    """Silence in ``audio_format`` without ffmpeg; only the formats built here are supported."""
+    if audio_format == "mp3":
+        return _SILENT_MP3_FRAME * max(1, round(seconds * SAMPLE_RATE / 576))
+    samples = bytes(2 * int(seconds * SAMPLE_RATE))
+    if audio_format == "pcm":
+        return samples
+    if audio_format == "wav":
+        return pcm_to_wav(samples, SAMPLE_RATE)
+    raise RuntimeError(f"ffmpeg is required to synthesize {audio_format} audio")
@@ -0,0 +1,118 @@
+"""Stand-ins for the OpenAI Responses and speech endpoints."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Tuple
+import json
+import time
+import uuid
+
+from ..openai_utils import SUMMARY_SYSTEM_PROMPT
+from . import content
+from .media import SPEECH_CONTENT_TYPES
+from .server import Route, StandInHandler, route
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _input_text(request: Dict[str, Any]) -> str:
+    items = request.get("input") or []
+    if isinstance(items, str):
+        return items
+    return "\n".join(str(item.get("content", "")) for item in items if isinstance(item, dict))
+
+
+def _answer(handler: StandInHandler, request: Dict[str, Any]) -> str:
+    """Pick a synthetic answer from what the pipeline is asking for."""
+    prompt = _input_text(request)
+    rng = handler.server.rng(prompt)
+    settings = handler.settings
+    if SUMMARY_SYSTEM_PROMPT in prompt:
+        return content.summary(rng, settings.summary_words)
+    if "previous answer was cut off" in prompt:
+        return json.dumps({"segments": []})
+    return json.dumps(content.outline(rng, settings.segments, settings.script_words))
+
+
+def _message(item_id: str, text: str) -> Dict[str, Any]:
+    return {
+        "type": "message",
+        "id": item_id,
+        "status": "completed",
+        "role": "assistant",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def _response(request: Dict[str, Any], response_id: str, item_id: str, text: str, status: str = "completed") -> Dict[str, Any]:
+    prompt_tokens = _tokens(_input_text(request))
+    output_tokens = _tokens(text) if text else 0
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": request.get("model", "stand-in"),
+        "status": status,
+        "output": [_message(item_id, text)] if status == "completed" else [],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "temperature": request.get("temperature"),
+        "text": request.get("text") or {"format": {"type": "text"}},
+        "incomplete_details": None,
+        "error": None,
+        "usage": {
+            "input_tokens": prompt_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": prompt_tokens + output_tokens,
+        },
+    }
+
+
+def _events(request: Dict[str, Any], text: str, delta_chars: int = 16) -> Iterator[Tuple[str, Any]]:
+    response_id = f"resp_{uuid.uuid4().hex}"
+    item_id = f"msg_{uuid.uuid4().hex}"
+    sequence = iter(range(1 << 30))
+
+    def event(name: str, **payload: Any) -> Tuple[str, Any]:
+        return name, {"type": name, "sequence_number": next(sequence), **payload}
+
+    yield event("response.created", response=_response(request, response_id, item_id, "", status="in_progress"))
+    yield event("response.output_item.added", output_index=0, item={**_message(item_id, ""), "status": "in_progress", "content": []})
+    yield event("response.content_part.added", item_id=item_id, output_index=0, content_index=0, part={"type": "output_text", "text": "", "annotations": []})
+    for start in range(0, len(text), delta_chars):
+        yield event("response.output_text.delta", item_id=item_id, output_index=0, content_index=0, delta=text[start:start + delta_chars], logprobs=[])
+    yield event("response.output_text.done", item_id=item_id, output_index=0, content_index=0, text=text, logprobs=[])
+    yield event("response.content_part.done", item_id=item_id, output_index=0, content_index=0, part={"type": "output_text", "text": text, "annotations": []})
+    yield event("response.output_item.done", output_index=0, item=_message(item_id, text))
+    yield event("response.completed", response=_response(request, response_id, item_id, text))
+
+
+@route("openai", "POST", r"/v1/responses")
+def create_response(handler: StandInHandler, match: Any) -> None:
+    request = handler.read_json()
+    text = _answer(handler, request)
+    if request.get("stream"):
+        delta_chars = 16
+        rate = handler.settings.output_tokens_per_second
+        handler.send_events(_events(request, text, delta_chars), pause=delta_chars / 4 / rate if rate else 0.0)
+        return
+    handler.send_json(200, _response(request, f"resp_{uuid.uuid4().hex}", f"msg_{uuid.uuid4().hex}", text))
+
+
+@route("speech", "POST", r"/v1/audio/speech")
+def create_speech(handler: StandInHandler, match: Any) -> None:
+    request = handler.read_json()
+    audio_format = request.get("response_format") or "mp3"
+    if audio_format not in SPEECH_CONTENT_TYPES:
+        handler.send_json(400, {"error": {"message": f"Unsupported response_format {audio_format}", "type": "invalid_request_error"}})
+        return
+    seconds = len(str(request.get("input", "")).split()) / handler.settings.words_per_second
+    path = handler.server.media.speech(audio_format, seconds)
+    handler.send_file(path, SPEECH_CONTENT_TYPES[audio_format])
+
+
+ROUTES: List[Route] = [create_response, create_speech]
@@ -0,0 +1,66 @@
+"""Stand-ins for Pexels video search and the CDN that serves the files."""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+import zlib
+
+from .server import Route, StandInHandler, route
+
+
+# Renditions advertised for every video, like Pexels' hd/sd variants.
+_RENDITIONS = ((1.0, "hd"), (0.5, "sd"))
+
+
+def _video(handler: StandInHandler, video_id: int) -> Dict[str, Any]:
+    settings = handler.settings
+    files = []
+    for scale, quality in _RENDITIONS:
+        width = int(settings.clip_width * scale) // 2 * 2
+        height = int(settings.clip_height * scale) // 2 * 2
+        files.append({
+            "id": video_id * 10 + len(files),
+            "quality": quality,
+            "file_type": "video/mp4",
+            "width": width,
+            "height": height,
+            "fps": settings.clip_fps,
+            "link": f"{handler.server.base_url}/video-files/{video_id}/{width}x{height}.mp4",
+        })
+    return {
+        "id": video_id,
+        "width": settings.clip_width,
+        "height": settings.clip_height,
+        "duration": int(settings.clip_seconds),
+        "url": f"https://www.pexels.com/video/stand-in-{video_id}/",
+        "image": "",
+        "user": {"id": 1, "name": "Stand-in", "url": ""},
+        "video_files": files,
+        "video_pictures": [],
+    }
+
+
+@route("pexels", "GET", r"/videos/search")
+def search(handler: StandInHandler, match: Any) -> None:
+    query = handler.query.get("query", [""])[0]
+    per_page = int(handler.query.get("per_page", ["15"])[0])
+    rng = handler.server.rng("pexels", query)
+    videos = []
+    if rng.random() >= handler.settings.missing_video_ratio:
+        first = zlib.crc32(query.encode("utf-8")) % 100000 * 100
+        videos = [_video(handler, first + index) for index in range(max(1, per_page))]
+    handler.send_json(
+        200,
+        {"page": 1, "per_page": per_page, "total_results": len(videos), "videos": videos},
+        {"X-Ratelimit-Limit": "200", "X-Ratelimit-Remaining": "199"},
+    )
+
+
+@route("pexels-cdn", "GET", r"/video-files/(\d+)/(\d+)x(\d+)\.mp4")
+def download(handler: StandInHandler, match: Any) -> None:
+    settings = handler.settings
+    width, height = int(match.group(2)), int(match.group(3))
+    path = handler.server.media.video(width, height, settings.clip_seconds, settings.clip_fps, settings.clip_bitrate)
+    handler.send_file(path, "video/mp4")
+
+
+ROUTES: List[Route] = [search, download]
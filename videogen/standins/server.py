@@ -0,0 +1,300 @@
+"""HTTP server hosting every stand-in API on one port."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, urlsplit
+import json
+import logging
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+
+from .media import MediaFactory
+
+
+logger = logging.getLogger(__name__)
+
+
+SERVICES = ("openai", "speech", "pexels", "pexels-cdn", "transcripts", "upload")
+
+
+@dataclass(frozen=True)
+class ServiceBehavior:
+    """Latency, failure rate and bandwidth injected into one stand-in service."""
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    bandwidth: float = 0.0  # bytes per second for response bodies, 0 for unlimited
+    error_status: int = 503
+
+
+def parse_behaviors(spec: str) -> Dict[str, ServiceBehavior]:
+    """Parse ``"openai=0.8:0.02,pexels-cdn=0.05:0:4000000,speech=0:0.1::429"``.
+
+    Fields are latency:error_rate:bandwidth:status; empty or missing ones keep
+    their defaults. A 429 status is sent with ``Retry-After``.
+    """
+    behaviors: Dict[str, ServiceBehavior] = {}
+    default = ServiceBehavior()
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        parts = values.split(":") if values else []
+        if len(parts) > 4:
+            raise ValueError(f"Expected latency:error_rate:bandwidth:status in {item!r}")
+        latency, error_rate, bandwidth, status = parts + [""] * (4 - len(parts))
+        behaviors[name.strip()] = ServiceBehavior(
+            latency=float(latency) if latency else default.latency,
+            error_rate=float(error_rate) if error_rate else default.error_rate,
+            bandwidth=float(bandwidth) if bandwidth else default.bandwidth,
+            error_status=int(status) if status else default.error_status,
+        )
+    return behaviors
+
+
+@dataclass
+class StandInSettings:
+    """Shape of the synthetic workload the stand-ins serve."""
+
+    host: str = "127.0.0.1"
+    port: int = 0
+    seed: int = 0
+    behaviors: Dict[str, ServiceBehavior] = field(default_factory=dict)
+    # OpenAI
+    segments: int = 6
+    script_words: int = 120
+    summary_words: int = 150
+    output_tokens_per_second: float = 0.0  # pace of streamed deltas, 0 sends at once
+    words_per_second: float = 2.5  # narration length derived from the script
+    # Pexels
+    clip_width: int = 1280
+    clip_height: int = 720
+    clip_seconds: float = 10.0
+    clip_fps: int = 25
+    clip_bitrate: str = "2M"
+    missing_video_ratio: float = 0.0
+    # YouTube
+    transcript_words: int = 3000
+    upload_accept_bytes: int = 0  # most bytes kept from one upload request, 0 keeps all
+    media_dir: Optional[Path] = None
+
+    def behavior(self, service: str) -> ServiceBehavior:
+        return self.behaviors.get(service) or self.behaviors.get("*") or ServiceBehavior()
+
+
+Handler = Callable[["StandInHandler", "re.Match[str]"], None]
+
+
+@dataclass(frozen=True)
+class Route:
+    service: str
+    method: str
+    pattern: Pattern[str]
+    handler: Handler
+
+
+def route(service: str, method: str, pattern: str) -> Callable[[Handler], Route]:
+    def decorate(handler: Handler) -> Route:
+        return Route(service, method, re.compile(pattern + r"$"), handler)
+
+    return decorate
+
+
+class InjectedFailure(Exception):
+    """Raised by fault injection to short-circuit a request."""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Dispatches requests to the routes registered on the server."""
+
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+    service = ""
+    behavior = ServiceBehavior()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    @property
+    def settings(self) -> StandInSettings:
+        return self.server.settings
+
+    @property
+    def query(self) -> Dict[str, List[str]]:
+        return parse_qs(urlsplit(self.path).query)
+
+    def _dispatch(self, method: str) -> None:
+        path = urlsplit(self.path).path
+        for candidate in self.server.routes:
+            match = candidate.pattern.match(path) if candidate.method == method else None
+            if match is None:
+                continue
+            self.service = candidate.service
+            self.behavior = self.settings.behavior(candidate.service)
+            self.server.count(candidate.service, "requests")
+            try:
+                self._inject(candidate.service)
+                candidate.handler(self, match)
+            except InjectedFailure:
+                pass
+            except (BrokenPipeError, ConnectionResetError):
+                logger.debug("Client went away during %s %s", method, path)
+            except (RuntimeError, OSError, subprocess.CalledProcessError) as exc:  # media synthesis failed before anything was sent
+                logger.error("Stand-in %s failed: %s", candidate.service, exc)
+                self.send_json(500, {"error": {"message": str(exc), "type": "server_error"}})
+            return
+        self.read_body()
+        self.send_json(404, {"error": {"message": f"No stand-in for {method} {path}", "type": "not_found"}})
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def _inject(self, service: str) -> None:
+        behavior = self.behavior
+        if behavior.latency:
+            time.sleep(behavior.latency * self.server.random.uniform(0.5, 1.5))
+        if behavior.error_rate and self.server.random.random() < behavior.error_rate:
+            self.read_body()
+            self.server.count(service, "errors")
+            status = behavior.error_status
+            headers = {"Retry-After": "1", "x-ratelimit-remaining": "0"} if status == 429 else {}
+            self.send_json(status, {"error": {"message": "Injected failure", "type": "server_error", "code": status}}, headers)
+            raise InjectedFailure
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.server.count(self.service, "bytes_in", len(body))
+        return body
+
+    def read_json(self) -> Any:
+        body = self.read_body()
+        return json.loads(body) if body else {}
+
+    def _send_headers(self, status: int, content_type: str, headers: Optional[Mapping[str, str]], length: Optional[int]) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if length is None:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(length))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _write(self, data: bytes, chunked: bool = False) -> None:
+        bandwidth = self.behavior.bandwidth
+        step = 64 * 1024
+        for start in range(0, len(data), step):
+            piece = data[start:start + step]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece) if chunked else piece)
+            self.server.count(self.service, "bytes_out", len(piece))
+            if bandwidth:
+                time.sleep(len(piece) / bandwidth)
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Mapping[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self._send_headers(status, "application/json", headers, len(body))
+        self._write(body)
+
+    def send_bytes(self, data: bytes, content_type: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        self._send_headers(200, content_type, headers, len(data))
+        self._write(data)
+
+    def send_file(self, path: Path, content_type: str) -> None:
+        self.send_bytes(path.read_bytes(), content_type)
+
+    def send_events(self, events: Iterable[Tuple[str, Any]], pause: float = 0.0) -> None:
+        """Stream server-sent events with chunked transfer encoding."""
+        self._send_headers(200, "text/event-stream", {"Cache-Control": "no-cache"}, None)
+        for name, payload in events:
+            self._write(f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"), chunked=True)
+            self.wfile.flush()
+            if pause:
+                time.sleep(pause)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves the OpenAI, Pexels, transcript and YouTube upload stand-ins.
+
+    ``environment()`` returns the variables that point ``VideoGenConfig`` at it.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, settings: Optional[StandInSettings] = None) -> None:
+        from . import openai_api, pexels_api, youtube_api
+
+        self.settings = settings or StandInSettings()
+        super().__init__((self.settings.host, self.settings.port), StandInHandler)
+        self.routes: List[Route] = [*openai_api.ROUTES, *pexels_api.ROUTES, *youtube_api.ROUTES]
+        self.random = random.Random(self.settings.seed)
+        media_dir = self.settings.media_dir or Path(tempfile.mkdtemp(prefix="videogen-standins-"))
+        self.media = MediaFactory(media_dir)
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        return {
+            "VIDEOGEN_OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "VIDEOGEN_PEXELS_BASE_URL": self.base_url,
+            "VIDEOGEN_TRANSCRIPT_BASE_URL": self.base_url,
+            "VIDEOGEN_YOUTUBE_API_ENDPOINT": f"{self.base_url}/youtube/v3/",
+        }
+
+    def count(self, service: str, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(service, {})
+            counters[name] = counters.get(name, 0) + amount
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests, injected errors and bytes moved per service so far."""
+        with self._stats_lock:
+            return {service: dict(counters) for service, counters in self._stats.items()}
+
+    def rng(self, *parts: Any) -> random.Random:
+        """A generator seeded from the settings seed and ``parts``, for repeatable payloads."""
+        return random.Random(":".join(map(str, (self.settings.seed, *parts))))
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="videogen-standins", daemon=True)
+        self._thread.start()
+        logger.info("Stand-in APIs listening on %s", self.base_url)
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self if self._thread is not None else self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def start_standins(settings: Optional[StandInSettings] = None) -> StandInServer:
+    """Start the stand-ins on a background thread."""
+    return StandInServer(settings).start()
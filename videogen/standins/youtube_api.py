@@ -0,0 +1,82 @@
+"""Stand-ins for caption fetching and the YouTube resumable upload protocol."""
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple
+import re
+import uuid
+
+from . import content
+from .server import Route, StandInHandler, route
+
+
+UPLOAD_PATH = "/upload/youtube/v3/videos"
+
+
+@route("transcripts", "GET", r"/transcripts/([\w-]+)")
+def transcript(handler: StandInHandler, match: Any) -> None:
+    video_id = match.group(1)
+    rng = handler.server.rng("transcript", video_id)
+    handler.send_json(200, content.transcript_entries(rng, handler.settings.transcript_words))
+
+
+@route("upload", "POST", UPLOAD_PATH)
+def start_upload(handler: StandInHandler, match: Any) -> None:
+    """Open a resumable session; the metadata is echoed back when the upload completes."""
+    metadata = handler.read_json()
+    upload_id = uuid.uuid4().hex
+    handler.server.uploads[upload_id] = {
+        "metadata": metadata,
+        "size": int(handler.headers.get("X-Upload-Content-Length") or 0),
+        "received": 0,
+    }
+    location = f"{handler.server.base_url}{UPLOAD_PATH}?uploadType=resumable&upload_id={upload_id}"
+    handler.send_json(200, {}, {"Location": location})
+
+
+def _content_range(header: str) -> Tuple[Optional[int], Optional[int]]:
+    """``(first byte, total)`` from ``bytes 0-99/300`` or ``bytes */300``; ``None`` where unknown."""
+    match = re.match(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", header)
+    if match is None:
+        return None, None
+    first, total = match.groups()
+    return (int(first) if first else None), (int(total) if total != "*" else None)
+
+
+@route("upload", "PUT", UPLOAD_PATH)
+def upload_chunk(handler: StandInHandler, match: Any) -> None:
+    """Take the next chunk, or answer a ``bytes */total`` status query, like the resumable protocol.
+
+    With ``upload_accept_bytes`` set only that much of each chunk is kept, so
+    the client has to resume from the ``Range`` it gets back.
+    """
+    upload_id = handler.query.get("upload_id", [""])[0]
+    session = handler.server.uploads.get(upload_id)
+    body = handler.read_body()
+    if session is None:
+        handler.send_json(404, {"error": {"code": 404, "message": "Unknown upload session"}})
+        return
+    first, total = _content_range(handler.headers.get("Content-Range", ""))
+    if total is not None:
+        session["size"] = total
+    if body and (first is None or first <= session["received"]):
+        limit = handler.settings.upload_accept_bytes
+        kept = body[:limit] if limit else body
+        session["received"] = max(session["received"], (first or 0) + len(kept))
+    if session["size"] and session["received"] < session["size"]:
+        handler.send_response(308)
+        if session["received"]:
+            handler.send_header("Range", f"bytes=0-{session['received'] - 1}")
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+        return
+    handler.server.uploads.pop(upload_id, None)
+    metadata = session["metadata"]
+    handler.send_json(200, {
+        "kind": "youtube#video",
+        "id": upload_id[:11],
+        "snippet": metadata.get("snippet", {}),
+        "status": {**metadata.get("status", {}), "uploadStatus": "uploaded"},
+    })
+
+
+ROUTES: List[Route] = [transcript, start_upload, upload_chunk]
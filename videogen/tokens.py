@@ -0,0 +1,55 @@
+"""Token counting for prompt sizing."""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+import re
+
+try:  # optional dependency: exact counts when tiktoken is installed
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+    except (KeyError, ValueError):
+        return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many model tokens ``text`` will use without a tokenizer.
+
+    Counts words and punctuation marks, adding one extra token for every four
+    characters beyond the first four of a long word, which tracks BPE
+    tokenisers closely enough for budgeting.
+    """
+    total = 0
+    for match in _TOKEN_RE.finditer(text):
+        total += 1 + max(0, len(match.group(0)) - 4) // 4
+    return total
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate them."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+
+def count_tokens_many(texts: Iterable[str], model: Optional[str] = None) -> List[int]:
+    """Token counts for many texts; tiktoken encodes them as one batch."""
+    texts = list(texts)
+    encoding = _encoding(model)
+    if encoding is None:
+        return [estimate_tokens(text) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
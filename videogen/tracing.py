@@ -0,0 +1,209 @@
+"""Lightweight span tracing with Chrome trace-event and optional OTLP export."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """One timed operation; times are ``time.time_ns()`` values."""
+
+    span_id: int
+    name: str
+    category: str
+    start_ns: int
+    end_ns: int = 0
+    parent_id: Optional[int] = None
+    track: Tuple[int, str] = (0, "")
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("videogen_span", default=None)
+
+
+def _track() -> Tuple[int, str]:
+    """Timeline row for the caller: the asyncio task if there is one, else the thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident or 0, thread.name
+
+
+class Tracer:
+    """Collects finished spans from every thread and task of the process."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def start(self, name: str, category: str = "videogen", **attributes: Any) -> Optional[Span]:
+        """Open a span without making it the current one.
+
+        For work that is interleaved with its caller, such as a generator
+        that yields while the span is open; close it with :meth:`finish`.
+        """
+        if not self.enabled:
+            return None
+        parent = _current.get()
+        return Span(
+            span_id=next(self._ids),
+            name=name,
+            category=category,
+            start_ns=time.time_ns(),
+            parent_id=parent.span_id if parent else None,
+            track=_track(),
+            attributes=attributes,
+        )
+
+    def finish(self, item: Optional[Span], error: Optional[BaseException] = None) -> None:
+        if item is None:
+            return
+        if error is not None:
+            item.error = f"{type(error).__name__}: {error}"
+        item.end_ns = time.time_ns()
+        with self._lock:
+            self.spans.append(item)
+
+    @contextmanager
+    def span(self, name: str, category: str = "videogen", **attributes: Any) -> Iterator[Optional[Span]]:
+        current = self.start(name, category, **attributes)
+        if current is None:
+            yield None
+            return
+        token = _current.set(current)
+        error: Optional[BaseException] = None
+        try:
+            yield current
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            try:
+                _current.reset(token)
+            except ValueError:  # closed from another context, e.g. an abandoned generator
+                pass
+            self.finish(current, error)
+
+    def finished(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda item: item.start_ns)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The spans as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        spans = self.finished()
+        origin = spans[0].start_ns if spans else 0
+        pid = os.getpid()
+        tracks: Dict[int, int] = {}
+        events: List[Dict[str, Any]] = []
+        for item in spans:
+            key, label = item.track
+            if key not in tracks:
+                tracks[key] = len(tracks) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tracks[key], "args": {"name": label}})
+            args = dict(item.attributes)
+            if item.error:
+                args["error"] = item.error
+            events.append({
+                "name": item.name,
+                "cat": item.category,
+                "ph": "X",
+                "ts": (item.start_ns - origin) / 1000,
+                "dur": (item.end_ns - item.start_ns) / 1000,
+                "pid": pid,
+                "tid": tracks[key],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        logger.info("Wrote %d spans to %s", len(self.spans), path)
+        return path
+
+    def export_otlp(self, endpoint: str, service_name: str = "videogen") -> bool:
+        """Send the spans to an OTLP/HTTP collector; needs ``opentelemetry-exporter-otlp``."""
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.trace import Status, StatusCode, set_span_in_context
+        except ImportError:
+            logger.warning("opentelemetry-sdk and opentelemetry-exporter-otlp are required for OTLP export")
+            return False
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(SimpleSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        otel_tracer = provider.get_tracer(__name__)
+        spans = self.finished()
+        started: Dict[int, Any] = {}
+        for item in spans:
+            parent_id = item.parent_id if item.parent_id is not None else _enclosing(spans, item)
+            context = set_span_in_context(started[parent_id]) if parent_id in started else None
+            otel_span = otel_tracer.start_span(item.name, context=context, start_time=item.start_ns, attributes=_otel_attributes(item))
+            if item.error:
+                otel_span.set_status(Status(StatusCode.ERROR, item.error))
+            started[item.span_id] = otel_span
+        # Children end first so the exporter sees complete spans.
+        for item in sorted(spans, key=lambda entry: entry.end_ns):
+            started[item.span_id].end(end_time=item.end_ns)
+        provider.shutdown()
+        logger.info("Exported %d spans to %s", len(spans), endpoint)
+        return True
+
+
+def _enclosing(spans: List[Span], item: Span) -> Optional[int]:
+    """The outermost earlier span that covers ``item``, used as parent for pool-thread spans."""
+    for candidate in spans:
+        if candidate is item or candidate.start_ns > item.start_ns:
+            break
+        if candidate.end_ns >= item.end_ns and candidate.parent_id is None:
+            return candidate.span_id
+    return None
+
+
+def _otel_attributes(item: Span) -> Dict[str, Any]:
+    attributes = {"category": item.category, "thread": item.track[1]}
+    for key, value in item.attributes.items():
+        attributes[key] = value if isinstance(value, (str, bool, int, float)) else str(value)
+    return attributes
+
+
+_tracer = Tracer(enabled=False)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def configure_tracer(enabled: bool = True) -> Tracer:
+    """Replace the process-wide tracer; disabled tracing costs one attribute check per span."""
+    global _tracer
+    _tracer = Tracer(enabled=enabled)
+    return _tracer
+
+
+def span(name: str, category: str = "videogen", **attributes: Any):
+    """Time the enclosed block as a span on the process-wide tracer."""
+    return _tracer.span(name, category, **attributes)
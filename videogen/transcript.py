@@ -0,0 +1,150 @@
+"""Compact, timestamp-preserving transcript representation."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+
+class TimedTranscript:
+    """Caption text stored once, with parallel per-entry arrays.
+
+    ``offsets``/``lengths`` locate each caption entry inside ``text`` and
+    ``starts``/``durations`` hold its timing in seconds. The arrays are plain
+    :mod:`array` buffers, so a multi-hour transcript costs a few bytes per entry
+    instead of one dict per caption line.
+    """
+
+    __slots__ = ("text", "offsets", "lengths", "starts", "durations", "_ends")
+
+    def __init__(self, text: str, offsets: array, lengths: array, starts: array, durations: array) -> None:
+        self.text = text
+        self.offsets = offsets
+        self.lengths = lengths
+        self.starts = starts
+        self.durations = durations
+        self._ends: array | None = None
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]], separator: str = " ") -> "TimedTranscript":
+        """Build from ``YouTubeTranscriptApi`` style ``{text, start, duration}`` dicts."""
+        parts = []
+        offsets, lengths = array("L"), array("L")
+        starts, durations = array("d"), array("d")
+        position = 0
+        for entry in entries:
+            text = entry["text"].strip()
+            if not text:
+                continue
+            if parts:
+                position += len(separator)
+            parts.append(text)
+            offsets.append(position)
+            lengths.append(len(text))
+            starts.append(float(entry.get("start", 0.0)))
+            durations.append(float(entry.get("duration", 0.0)))
+            position += len(text)
+        return cls(separator.join(parts), offsets, lengths, starts, durations)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def duration(self) -> float:
+        """Time in seconds at which the last caption ends."""
+        if not self.starts:
+            return 0.0
+        return max(start + duration for start, duration in zip(self.starts, self.durations))
+
+    def entry(self, index: int) -> Tuple[str, float, float]:
+        """Return ``(text, start, duration)`` for a single caption entry."""
+        offset = self.offsets[index]
+        return self.text[offset:offset + self.lengths[index]], self.starts[index], self.durations[index]
+
+    def iter_entries(self) -> Iterator[Tuple[str, float, float]]:
+        for index in range(len(self)):
+            yield self.entry(index)
+
+    def window(self, first: int, last: int) -> "TranscriptWindow":
+        """View over entries ``first`` (inclusive) to ``last`` (exclusive)."""
+        first = max(0, first)
+        last = min(len(self), max(first, last))
+        return TranscriptWindow(self, first, last)
+
+    def _running_ends(self) -> array:
+        """Latest end time among entries ``0..i`` for each ``i``; non-decreasing, so it can be bisected."""
+        if self._ends is None:
+            ends = array("d")
+            latest = float("-inf")
+            for start, duration in zip(self.starts, self.durations):
+                latest = max(latest, start + duration)
+                ends.append(latest)
+            self._ends = ends
+        return self._ends
+
+    def slice_time(self, start: float, end: float) -> "TranscriptWindow":
+        """View over the entries that overlap the ``[start, end)`` time range.
+
+        Rolling captions overlap, so the first entry still running at ``start``
+        may begin several entries earlier; it is found by bisecting the running
+        maximum of end times. Shorter entries in between are part of the view.
+        """
+        first = bisect_right(self._running_ends(), start)
+        last = bisect_left(self.starts, end)
+        return self.window(first, last)
+
+    def slice_chars(self, start: int, end: int) -> "TranscriptWindow":
+        """View over the entries that overlap the ``[start, end)`` character range."""
+        first = max(bisect_right(self.offsets, start) - 1, 0)
+        if first < len(self) and self.offsets[first] + self.lengths[first] <= start:
+            first += 1
+        last = bisect_left(self.offsets, end)
+        return self.window(first, last)
+
+
+class TranscriptWindow:
+    """Lightweight view over a run of entries; text is only sliced on access."""
+
+    __slots__ = ("transcript", "first", "last")
+
+    def __init__(self, transcript: TimedTranscript, first: int, last: int) -> None:
+        self.transcript = transcript
+        self.first = first
+        self.last = last
+
+    def __len__(self) -> int:
+        return self.last - self.first
+
+    @property
+    def char_range(self) -> Tuple[int, int]:
+        if not len(self):
+            return 0, 0
+        transcript = self.transcript
+        end = transcript.offsets[self.last - 1] + transcript.lengths[self.last - 1]
+        return transcript.offsets[self.first], end
+
+    @property
+    def time_range(self) -> Tuple[float, float]:
+        if not len(self):
+            return 0.0, 0.0
+        transcript = self.transcript
+        end = max(transcript.starts[index] + transcript.durations[index] for index in range(self.first, self.last))
+        return transcript.starts[self.first], end
+
+    @property
+    def text(self) -> str:
+        start, end = self.char_range
+        return self.transcript.text[start:end]
+
+    def to_transcript(self) -> TimedTranscript:
+        """Materialise the window as an independent :class:`TimedTranscript`."""
+        transcript = self.transcript
+        base = transcript.offsets[self.first] if len(self) else 0
+        offsets = array("L", (offset - base for offset in transcript.offsets[self.first:self.last]))
+        return TimedTranscript(
+            self.text,
+            offsets,
+            transcript.lengths[self.first:self.last],
+            transcript.starts[self.first:self.last],
+            transcript.durations[self.first:self.last],
+        )
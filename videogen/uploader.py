@@ -2,21 +2,31 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict
+from urllib.parse import urlsplit
 import logging
 
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.http import MediaFileUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.credentials import AnonymousCredentials
 from google.auth.transport.requests import Request
 import google.oauth2.credentials
 import json
 
+from .metrics import get_metrics
+from .ratelimit import retry_call
+from .tracing import span
+
 
 logger = logging.getLogger(__name__)
 
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+# A multiple of 256 KiB. A single whole-file chunk (-1) cannot be resumed:
+# googleapiclient sends a wrong Content-Range when it continues one.
+UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024
 
 
 def load_credentials(client_secret_path: Path, token_path: Path) -> google.oauth2.credentials.Credentials:
@@ -35,19 +45,42 @@ def load_credentials(client_secret_path: Path, token_path: Path) -> google.oauth
     return credentials
 
 
-def upload_video(video_path: Path, title: str, description: str, client_secret_path: Path, token_path: Path, category_id: str = "22", tags: list[str] | None = None, privacy_status: str = "unlisted") -> Dict:
-    credentials = load_credentials(client_secret_path, token_path)
-    youtube = build("youtube", "v3", credentials=credentials)
+def endpoint_client(api_endpoint: str) -> Any:
+    """A YouTube client for another server, built from the bundled discovery document.
+
+    ``client_options={"api_endpoint": ...}`` alone only moves the host of
+    media uploads and keeps the ``https`` scheme, so the document's
+    ``rootUrl`` is pointed at the endpoint as well.
+    """
+    document = json.loads(discovery_cache.get_static_doc("youtube", "v3"))
+    parts = urlsplit(api_endpoint)
+    document["rootUrl"] = f"{parts.scheme}://{parts.netloc}/"
+    return build_from_document(document, credentials=AnonymousCredentials(), client_options={"api_endpoint": api_endpoint})
+
+
+def upload_video(video_path: Path, title: str, description: str, client_secret_path: Path, token_path: Path, category_id: str = "22", tags: list[str] | None = None, privacy_status: str = "unlisted", api_endpoint: str | None = None, chunksize: int = UPLOAD_CHUNK_BYTES) -> Dict:
+    """Upload ``video_path`` with the resumable protocol.
+
+    ``api_endpoint`` points the client at another server, such as the offline
+    stand-in; no OAuth flow is run in that case.
+    """
+    if api_endpoint:
+        youtube = endpoint_client(api_endpoint)
+    else:
+        credentials = load_credentials(client_secret_path, token_path)
+        youtube = build("youtube", "v3", credentials=credentials)
     body = {
         "snippet": {"title": title, "description": description, "categoryId": category_id, "tags": tags or []},
         "status": {"privacyStatus": privacy_status},
     }
-    media = MediaFileUpload(str(video_path), chunksize=-1, resumable=True)
+    media = MediaFileUpload(str(video_path), chunksize=chunksize, resumable=True)
     request = youtube.videos().insert(part="snippet,status", body=body, media_body=media)
     response = None
-    while response is None:
-        status, response = request.next_chunk()
-        if status:
-            logger.info("Upload progress: %.2f%%", status.progress() * 100)
+    size = video_path.stat().st_size
+    with span("youtube.upload", "youtube", bytes=size), get_metrics().measure("youtube", "upload", bytes_out=size):
+        while response is None:
+            status, response = retry_call("youtube", request.next_chunk)
+            if status:
+                logger.info("Upload progress: %.2f%%", status.progress() * 100)
     logger.info("Uploaded video id: %s", response.get("id"))
     return response
@@ -1,13 +1,27 @@
 """Utilities for working with YouTube videos and captions."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import logging
 import re
+import requests
 
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
 
+from .cache import DiskCache, make_key
+from .metrics import get_metrics
+from .ratelimit import retry_call
+from .tracing import span
+from .transcript import TimedTranscript
+
+try:
+    from youtube_transcript_api import TooManyRequests
+    _RETRYABLE_ERRORS: Tuple[type, ...] = (TooManyRequests,)
+except ImportError:  # pragma: no cover - not exported by every release
+    _RETRYABLE_ERRORS = ()
+
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +36,7 @@ class VideoTranscript:
     video_id: str
     title: str
     text: str
+    timeline: Optional[TimedTranscript] = field(default=None, repr=False)
 
 
 def extract_video_id(url: str) -> str:
@@ -32,23 +47,101 @@ def extract_video_id(url: str) -> str:
     return match.group(1)
 
 
-def download_transcript(video_id: str, languages: Iterable[str] | None = None) -> str:
-    """Download transcript text for the supplied video."""
+def _fetch_from_service(base_url: str, video_id: str, languages: List[str]) -> List[Dict[str, Any]]:
+    """Fetch caption entries from a transcript service such as the offline stand-in."""
+    response = requests.get(f"{base_url.rstrip('/')}/transcripts/{video_id}", params={"languages": ",".join(languages)}, timeout=30)
+    if response.status_code == 404:
+        raise RuntimeError(f"No transcript available for video {video_id}")
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_transcript_entries(video_id: str, languages: Iterable[str] | None = None, cache: DiskCache | None = None, base_url: str | None = None) -> List[Dict[str, Any]]:
+    """Return the raw caption entries for a video, reading through ``cache`` if given.
+
+    Entries are cached under the video id plus the ordered language preference,
+    so a different preference never returns another language's captions. With
+    ``base_url`` captions come from that transcript service instead of YouTube.
+    """
     languages = list(languages or ("tr", "en"))
+    # Captions from another service are kept apart from YouTube's own.
+    key = make_key("transcript", video_id, languages, *([base_url] if base_url else []))
+    if cache is not None:
+        cached = cache.get_json(key)
+        if cached is not None:
+            logger.info("Using cached transcript for %s", video_id)
+            return cached
+
+    def fetch() -> List[Dict[str, Any]]:
+        if base_url:
+            return _fetch_from_service(base_url, video_id, languages)
+        return YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+
     try:
-        segments = YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+        with get_metrics().measure("youtube", "transcript"):
+            segments = retry_call("youtube", fetch, retry_exceptions=_RETRYABLE_ERRORS)
     except TranscriptsDisabled as exc:  # pragma: no cover - network failure case
         raise RuntimeError(f"Transcripts disabled for video {video_id}") from exc
-    combined = " ".join(entry["text"].strip() for entry in segments if entry["text"].strip())
-    return combined
-
-
-def gather_transcripts(urls: Iterable[str]) -> List[VideoTranscript]:
-    """Collect transcripts for each supplied URL."""
-    transcripts: List[VideoTranscript] = []
-    for url in urls:
-        video_id = extract_video_id(url)
-        text = download_transcript(video_id)
-        transcripts.append(VideoTranscript(video_id=video_id, title=video_id, text=text))
-        logger.info("Downloaded transcript for %s", video_id)
+    if cache is not None:
+        cache.set_json(key, segments)
+    return segments
+
+
+def download_timed_transcript(video_id: str, languages: Iterable[str] | None = None, cache: DiskCache | None = None, base_url: str | None = None) -> TimedTranscript:
+    """Download a transcript keeping each caption's start and duration."""
+    return TimedTranscript.from_entries(fetch_transcript_entries(video_id, languages, cache=cache, base_url=base_url))
+
+
+def download_transcript(video_id: str, languages: Iterable[str] | None = None, cache: DiskCache | None = None, base_url: str | None = None) -> str:
+    """Download transcript text for the supplied video."""
+    return download_timed_transcript(video_id, languages, cache=cache, base_url=base_url).text
+
+
+@dataclass
+class TranscriptFailure:
+    """A URL whose transcript could not be fetched."""
+
+    url: str
+    error: str
+
+
+def _fetch_one(url: str, cache: DiskCache | None, base_url: str | None = None) -> VideoTranscript:
+    video_id = extract_video_id(url)
+    with span("transcript", "youtube", video_id=video_id):
+        timeline = download_timed_transcript(video_id, cache=cache, base_url=base_url)
+    logger.info("Downloaded transcript for %s", video_id)
+    return VideoTranscript(video_id=video_id, title=video_id, text=timeline.text, timeline=timeline)
+
+
+def fetch_transcripts(urls: Iterable[str], max_workers: int = 4, cache: DiskCache | None = None, base_url: str | None = None) -> Tuple[List[VideoTranscript], List[TranscriptFailure]]:
+    """Fetch transcripts concurrently, keeping input order and collecting failures.
+
+    At most ``max_workers`` requests are in flight at once. A failing URL does not
+    abort the batch; it is reported in the returned failure list instead.
+    """
+    urls = list(urls)
+    results: List[Optional[VideoTranscript]] = [None] * len(urls)
+    failures: List[TranscriptFailure] = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_fetch_one, url, cache, base_url) for url in urls]
+        for index, future in enumerate(futures):
+            try:
+                results[index] = future.result()
+            except Exception as exc:  # collected per URL rather than failing the batch
+                logger.warning("Could not fetch transcript for %s: %s", urls[index], exc)
+                failures.append(TranscriptFailure(url=urls[index], error=str(exc)))
+    return [transcript for transcript in results if transcript is not None], failures
+
+
+def gather_transcripts(urls: Iterable[str], max_workers: int = 4, cache: DiskCache | None = None, base_url: str | None = None) -> List[VideoTranscript]:
+    """Collect transcripts for each supplied URL.
+
+    URLs that fail are skipped with a warning; an error is raised only when no
+    transcript could be fetched at all.
+    """
+    urls = list(urls)
+    transcripts, failures = fetch_transcripts(urls, max_workers=max_workers, cache=cache, base_url=base_url)
+    if failures and not transcripts:
+        details = "; ".join(f"{failure.url}: {failure.error}" for failure in failures)
+        raise RuntimeError(f"No transcripts could be fetched ({details})")
     return transcripts